@@ -1,6 +1,19 @@
+from datetime import datetime
+
 import frappe
 from frappe import _
-from datetime import datetime
+
+from travel_agency_website import cms, facets, local_cache, package_details, search, snapshots
+from travel_agency_website.cache import get_tag_versions, get_tagged_value
+from travel_agency_website.catalog import (
+	catalog_ndjson_response,
+	catalog_response,
+	get_catalog_page,
+	get_catalog_version,
+	parse_list_param,
+)
+from travel_agency_website.http_cache import cache_policy, conditional_get
+
 
 @frappe.whitelist(allow_guest=True)
 def create_lead_from_website(first_name, email_id="", phone="", company_name="", notes="", package_id="", subject="", description=""):
@@ -84,15 +97,8 @@ def get_accommodation_files(accommodation_name):
         # Log the accommodation name being queried
         frappe.logger().info(f"Fetching files for accommodation: {accommodation_name}")
         
-        # Use get_all with ignore_permissions for guest users
-        files = frappe.get_all("File", 
-            filters={
-                "attached_to_doctype": "Accommodation",
-                "attached_to_name": accommodation_name
-            },
-            fields=["name", "file_name", "file_url", "is_private"],
-            ignore_permissions=True
-        )
+        # Shares the per-accommodation cache with the batch lookup
+        files = package_details.get_accommodation_files_map([accommodation_name])[accommodation_name]
         
         # Return files as-is, including private files
         # Private files will be served through Frappe's file serving mechanism
@@ -122,18 +128,40 @@ def get_accommodation_files(accommodation_name):
         }
 
 @frappe.whitelist(allow_guest=True)
+def get_accommodation_files_batch(accommodation_names):
+	"""Get files attached to several Accommodations, keyed by accommodation name"""
+	try:
+		names = parse_list_param(accommodation_names) or []
+		return {
+			"success": True,
+			"files": package_details.get_accommodation_files_map(names)
+		}
+	except Exception as e:
+		frappe.log_error(f"Error fetching accommodation files: {e!s}")
+		return {
+			"success": False,
+			"message": str(e),
+			"files": {}
+		}
+
+@frappe.whitelist(allow_guest=True)
+@cache_policy("catalog")
+def get_package_details(name):
+	"""Get a package with its child tables, Accommodation records and their files in one call"""
+	return {
+		"error": None,
+		"data": package_details.get_package_details(name)
+	}
+
+@frappe.whitelist(allow_guest=True)
+@cache_policy("cms")
+@conditional_get(cms.get_cms_version)
 def get_website_cms():
     """Get Website CMS data with all related child tables"""
     try:
-        # Get the main Website CMS document
-        cms_doc = frappe.get_doc("Website CMS", "Website CMS", ignore_permissions=True)
-        
-        # Convert to dict and include all child table data
-        cms_data = cms_doc.as_dict()
-        
-        return {
-            "docs": [cms_data]
-        }
+        # Serialized payload cached in Redis, refreshed whenever Website CMS is saved.
+        # If rebuilding it fails, the last good payload is served marked stale
+        return cms.cms_payload_response()
     except Exception as e:
         frappe.log_error(f"Error in get_website_cms: {str(e)}")
         return {
@@ -142,74 +170,44 @@ def get_website_cms():
         }
 
 @frappe.whitelist(allow_guest=True)
+@cache_policy("cms")
+def get_website_cms_sections(sections=None):
+	"""Get only the requested Website CMS sections, e.g. `hero,navigation,footer`"""
+	return {
+		"data": cms.get_cms_sections(sections)
+	}
+
+@frappe.whitelist(allow_guest=True)
+def get_csrf_token():
+	"""CSRF token of the session, which the cached page shell no longer carries"""
+	if frappe.session.user == "Guest":
+		return None
+	return frappe.sessions.get_csrf_token()
+
+@frappe.whitelist()
+def get_local_cache_stats():
+	"""Hit, miss, eviction and size counters of the per-worker local caches"""
+	frappe.only_for("System Manager")
+	return {
+		"data": local_cache.get_stats()
+	}
+
+@frappe.whitelist(allow_guest=True)
+def get_snapshot_manifest():
+	"""URLs of the content-hashed static JSON snapshots (Website CMS, catalog, blog index)"""
+	return {
+		"data": snapshots.get_snapshot_manifest()
+	}
+
+@frappe.whitelist(allow_guest=True)
+@cache_policy("catalog")
+@conditional_get(get_catalog_version)
 def get_items_with_accommodation():
     """Get all items with their accommodation list and custom fields"""
     try:
-        # Get all items with basic fields
-        items = frappe.get_all("Item",
-            filters={"disabled": 0, "custom_publish_on_website": 1}, # Only published & enabled items
-            fields=[
-                "name", 
-                "item_name", 
-                "item_group", 
-                "standard_rate",
-                "custom_website_price_to_show",
-                "image",
-                "custom_duration",
-                "custom_package_rating",
-                "custom_air_information",
-                "custom_food_information",
-                "custom_bustaxi_information"
-            ],
-            ignore_permissions=True
-        )
-        
-        # For each item, get the accommodation list
-        for item in items:
-            # Get accommodation list for this item
-            accommodation_list = frappe.get_all("Accommodation List",
-                filters={"parent": item.name},
-                fields=["hotel", "distance"],
-                ignore_permissions=True
-            )
-            item["custom_accommodation_list"] = accommodation_list
-            
-            # Get features for this item
-            features = frappe.get_all("Package Feature",
-                filters={"parent": item.name},
-                fields=["title"],
-                ignore_permissions=True
-            )
-            item["custom_features"] = features
-            
-            # Get inclusions for this item
-            inclusions = frappe.get_all("Title With Description",
-                filters={"parent": item.name, "parentfield": "custom_inclusions"},
-                fields=["title", "description"],
-                ignore_permissions=True
-            )
-            item["custom_inclusions"] = inclusions
-            
-            # Get itinerary for this item
-            itinerary = frappe.get_all("Title With Description",
-                filters={"parent": item.name, "parentfield": "custom_itinerary"},
-                fields=["title", "description"],
-                ignore_permissions=True
-            )
-            item["custom_itinerary"] = itinerary
-            
-            # Get special services for this item
-            special_services = frappe.get_all("Title With Description",
-                filters={"parent": item.name, "parentfield": "custom_special_services"},
-                fields=["title", "description"],
-                ignore_permissions=True
-            )
-            item["custom_special_services"] = special_services
-        
-        return {
-            "error": None,
-            "data": items
-        }
+        # Served from the materialized catalog snapshot in Redis, or the last good
+        # one marked stale if rebuilding it fails
+        return catalog_response()
     except Exception as e:
         frappe.log_error(f"Error in get_items_with_accommodation: {str(e)}")
         return {
@@ -218,79 +216,127 @@ def get_items_with_accommodation():
         }
 
 @frappe.whitelist(allow_guest=True)
+@cache_policy("catalog")
+def get_package_catalog(cursor=None, limit=20, fields=None, include=None, projection=None):
+	"""Get a page of published packages with keyset pagination and field projection"""
+	return get_catalog_page(cursor=cursor, limit=limit, fields=fields, include=include, projection=projection)
+
+@frappe.whitelist(allow_guest=True)
+@cache_policy("catalog")
+def export_package_catalog():
+	"""Stream every published package with its child tables as NDJSON, one package per line"""
+	return catalog_ndjson_response()
+
+@frappe.whitelist(allow_guest=True)
+@cache_policy("catalog")
+def get_package_facets(item_group=None, dropdown=None, rating=None, price_min=None, price_max=None,
+		duration=None, sort="name", start=0, page_length=20, price_band=500):
+	"""Filter published packages server-side and return a page with facet counts"""
+	return facets.search_packages(
+		item_group=item_group,
+		dropdown=dropdown,
+		rating=rating,
+		price_min=price_min,
+		price_max=price_max,
+		duration=duration,
+		sort=sort,
+		start=start,
+		page_length=page_length,
+		price_band=price_band,
+	)
+
+@frappe.whitelist(allow_guest=True)
+@cache_policy("catalog")
+def search_packages(query, limit=20):
+	"""Full-text search over published packages, ranked by relevance"""
+	return search.search_packages(query, limit=limit)
+
+SITEMAP_CACHE_KEY = "travel_agency_website:sitemap"
+
+def build_sitemap_xml():
+    """Build the XML sitemap of static pages, packages and blog posts"""
+    site_url = frappe.utils.get_url()
+    urls = []
+    
+    # Static pages
+    static_pages = [
+        {'loc': '/', 'changefreq': 'daily', 'priority': '1.0'},
+        {'loc': '/about', 'changefreq': 'monthly', 'priority': '0.8'},
+        {'loc': '/contact', 'changefreq': 'monthly', 'priority': '0.8'},
+        {'loc': '/visa', 'changefreq': 'monthly', 'priority': '0.8'},
+        {'loc': '/blog', 'changefreq': 'daily', 'priority': '0.9'},
+        {'loc': '/gallery', 'changefreq': 'weekly', 'priority': '0.7'},
+        {'loc': '/terms', 'changefreq': 'yearly', 'priority': '0.5'},
+        {'loc': '/privacy', 'changefreq': 'yearly', 'priority': '0.5'},
+        {'loc': '/refund-policy', 'changefreq': 'yearly', 'priority': '0.5'},
+        {'loc': '/branches', 'changefreq': 'monthly', 'priority': '0.7'},
+    ]
+    
+    for page in static_pages:
+        urls.append({
+            'loc': f"{site_url}{page['loc']}",
+            'changefreq': page['changefreq'],
+            'priority': page['priority'],
+            'lastmod': datetime.now().strftime('%Y-%m-%d')
+        })
+    
+    # Package pages
+    packages = frappe.get_all("Item",
+        filters={"disabled": 0, "published_in_website": 1},
+        fields=["name", "modified"],
+        ignore_permissions=True
+    )
+    
+    for package in packages:
+        lastmod = package.get('modified', datetime.now()).strftime('%Y-%m-%d') if hasattr(package.get('modified'), 'strftime') else datetime.now().strftime('%Y-%m-%d')
+        urls.append({
+            'loc': f"{site_url}/packages/{package['name']}",
+            'changefreq': 'weekly',
+            'priority': '0.8',
+            'lastmod': lastmod
+        })
+    
+    # Blog posts
+    blogs = frappe.get_all("Blog",
+        filters={"published": 1},
+        fields=["slug", "modified"],
+        ignore_permissions=True
+    )
+    
+    for blog in blogs:
+        lastmod = blog.get('modified', datetime.now()).strftime('%Y-%m-%d') if hasattr(blog.get('modified'), 'strftime') else datetime.now().strftime('%Y-%m-%d')
+        urls.append({
+            'loc': f"{site_url}/blog/{blog['slug']}",
+            'changefreq': 'monthly',
+            'priority': '0.7',
+            'lastmod': lastmod
+        })
+    
+    # Generate XML
+    xml = '<?xml version="1.0" encoding="UTF-8"?>\n'
+    xml += '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    
+    for url in urls:
+        xml += '  <url>\n'
+        xml += f"    <loc>{url['loc']}</loc>\n"
+        xml += f"    <lastmod>{url['lastmod']}</lastmod>\n"
+        xml += f"    <changefreq>{url['changefreq']}</changefreq>\n"
+        xml += f"    <priority>{url['priority']}</priority>\n"
+        xml += '  </url>\n'
+    
+    xml += '</urlset>'
+    
+    return xml
+
+@frappe.whitelist(allow_guest=True)
+@cache_policy("sitemap")
+@conditional_get(lambda: (get_tag_versions("sitemap"), datetime.now().date()))
 def get_sitemap():
     """Generate XML sitemap for SEO"""
     try:
-        site_url = frappe.utils.get_url()
-        urls = []
-        
-        # Static pages
-        static_pages = [
-            {'loc': '/', 'changefreq': 'daily', 'priority': '1.0'},
-            {'loc': '/about', 'changefreq': 'monthly', 'priority': '0.8'},
-            {'loc': '/contact', 'changefreq': 'monthly', 'priority': '0.8'},
-            {'loc': '/visa', 'changefreq': 'monthly', 'priority': '0.8'},
-            {'loc': '/blog', 'changefreq': 'daily', 'priority': '0.9'},
-            {'loc': '/gallery', 'changefreq': 'weekly', 'priority': '0.7'},
-            {'loc': '/terms', 'changefreq': 'yearly', 'priority': '0.5'},
-            {'loc': '/privacy', 'changefreq': 'yearly', 'priority': '0.5'},
-            {'loc': '/refund-policy', 'changefreq': 'yearly', 'priority': '0.5'},
-            {'loc': '/branches', 'changefreq': 'monthly', 'priority': '0.7'},
-        ]
-        
-        for page in static_pages:
-            urls.append({
-                'loc': f"{site_url}{page['loc']}",
-                'changefreq': page['changefreq'],
-                'priority': page['priority'],
-                'lastmod': datetime.now().strftime('%Y-%m-%d')
-            })
-        
-        # Package pages
-        packages = frappe.get_all("Item",
-            filters={"disabled": 0, "published_in_website": 1},
-            fields=["name", "modified"],
-            ignore_permissions=True
-        )
-        
-        for package in packages:
-            lastmod = package.get('modified', datetime.now()).strftime('%Y-%m-%d') if hasattr(package.get('modified'), 'strftime') else datetime.now().strftime('%Y-%m-%d')
-            urls.append({
-                'loc': f"{site_url}/packages/{package['name']}",
-                'changefreq': 'weekly',
-                'priority': '0.8',
-                'lastmod': lastmod
-            })
-        
-        # Blog posts
-        blogs = frappe.get_all("Blog",
-            filters={"published": 1},
-            fields=["slug", "modified"],
-            ignore_permissions=True
-        )
-        
-        for blog in blogs:
-            lastmod = blog.get('modified', datetime.now()).strftime('%Y-%m-%d') if hasattr(blog.get('modified'), 'strftime') else datetime.now().strftime('%Y-%m-%d')
-            urls.append({
-                'loc': f"{site_url}/blog/{blog['slug']}",
-                'changefreq': 'monthly',
-                'priority': '0.7',
-                'lastmod': lastmod
-            })
-        
-        # Generate XML
-        xml = '<?xml version="1.0" encoding="UTF-8"?>\n'
-        xml += '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
-        
-        for url in urls:
-            xml += '  <url>\n'
-            xml += f"    <loc>{url['loc']}</loc>\n"
-            xml += f"    <lastmod>{url['lastmod']}</lastmod>\n"
-            xml += f"    <changefreq>{url['changefreq']}</changefreq>\n"
-            xml += f"    <priority>{url['priority']}</priority>\n"
-            xml += '  </url>\n'
-        
-        xml += '</urlset>'
+        # Cached under the `sitemap` tag, invalidated when Items or Blogs change.
+        # Expires daily so the static pages' lastmod stays current.
+        xml = get_tagged_value(SITEMAP_CACHE_KEY, build_sitemap_xml, ["sitemap"], expires_in_sec=86400)
         
         frappe.response['type'] = 'xml'
         frappe.response['filename'] = 'sitemap.xml'
@@ -301,15 +347,31 @@ def get_sitemap():
         frappe.throw(_("Error generating sitemap"))
 
 @frappe.whitelist(allow_guest=True)
+@cache_policy("seo")
+@conditional_get(lambda route: get_seo_settings_version(route))
 def get_seo_settings(route):
 	"""Get SEO settings for a specific route"""
 	try:
-		from travel_agency_website.travel_agency_website.doctype.seo_settings.seo_settings import get_seo_by_route
+		from travel_agency_website.travel_agency_website.doctype.seo_settings.seo_settings import (
+			get_seo_by_route,
+		)
+
 		return get_seo_by_route(route)
 	except ImportError:
 		# Fallback if DocType not yet migrated
 		return None
 
+def get_seo_settings_version(route):
+	"""Tag versions of the SEO data for `route`, without creating version keys for arbitrary paths"""
+	try:
+		from travel_agency_website.travel_agency_website.doctype.seo_settings.seo_settings import (
+			get_seo_route_tags,
+		)
+
+		return get_tag_versions(*get_seo_route_tags(route))
+	except ImportError:
+		return None
+
 @frappe.whitelist(allow_guest=True)
 def get_public_website_analytics():
 	"""Expose Google Analytics settings from Website Settings for the React SPA."""
@@ -0,0 +1,106 @@
+# Copyright (c) 2025, ERP Lagbe and contributors
+# For license information, please see license.txt
+
+import json
+import os
+from urllib.parse import quote
+
+import frappe
+
+from travel_agency_website.cms import get_cms_sections, get_hero_image
+
+# Vite writes the bundle and its manifest here, served under ASSETS_BASE_URL
+BUILD_PATH = os.path.join(os.path.dirname(__file__), "public", "web")
+MANIFEST_PATH = os.path.join(BUILD_PATH, ".vite", "manifest.json")
+ASSETS_BASE_URL = "/assets/travel_agency_website/web/"
+
+# Manifest key of the SPA entry point
+ENTRY = "index.html"
+
+# Font files bundled by the CSS, preloaded so text does not wait for the stylesheet
+FONT_EXTENSIONS = (".woff2",)
+
+# Routes that render the hero slider above the fold
+HOME_ROUTES = ("/", "/web")
+
+# Shell assets per process: (manifest mtime, assets)
+_shell_assets = None
+
+
+def get_shell_assets():
+	"""Entry script, stylesheets and modulepreload chunks of the SPA, read from the Vite manifest.
+
+	Returns None when the app has not been built.
+	"""
+	global _shell_assets
+	try:
+		mtime = os.path.getmtime(MANIFEST_PATH)
+	except FileNotFoundError:
+		frappe.log_error("Vite manifest not found, run the web build", MANIFEST_PATH)
+		return None
+
+	if _shell_assets and _shell_assets[0] == mtime:
+		return _shell_assets[1]
+
+	with open(MANIFEST_PATH) as f:
+		manifest = json.load(f)
+
+	_shell_assets = (mtime, resolve_entry(manifest, ENTRY))
+	return _shell_assets[1]
+
+
+def resolve_entry(manifest, entry):
+	"""URLs of the entry chunk, the chunks it statically imports and all their CSS"""
+	chunks = []
+	seen = set()
+
+	def visit(key):
+		if key in seen:
+			return
+		seen.add(key)
+		for imported in manifest[key].get("imports", []):
+			visit(imported)
+		chunks.append(manifest[key])
+
+	visit(entry)
+	return {
+		"script": ASSETS_BASE_URL + manifest[entry]["file"],
+		"modulepreload": [
+			ASSETS_BASE_URL + chunk["file"] for chunk in chunks if chunk is not manifest[entry]
+		],
+		"css": list(dict.fromkeys(ASSETS_BASE_URL + css for chunk in chunks for css in chunk.get("css", []))),
+		"fonts": list(
+			dict.fromkeys(
+				ASSETS_BASE_URL + asset
+				for chunk in chunks
+				for asset in chunk.get("assets", [])
+				if asset.endswith(FONT_EXTENSIONS)
+			)
+		),
+	}
+
+
+def get_preload_images(route):
+	"""Images to preload for `route`: the logo, and the hero background on the home page"""
+	sections = get_cms_sections(["business", "hero"])
+	images = [sections["business"].get("logo")]
+	if route in HOME_ROUTES:
+		images.insert(0, get_hero_image())
+	return [image for image in images if image]
+
+
+def get_link_header(route, assets):
+	"""`Link` header preloading the critical path of `route`.
+
+	Sent with the shell so the browser, or a CDN turning it into 103 Early Hints,
+	fetches the bundle, fonts and above-the-fold images before the HTML is parsed.
+	"""
+	links = []
+	if assets:
+		links.extend(f"<{href}>; rel=preload; as=style" for href in assets["css"])
+		links.extend(f"<{href}>; rel=modulepreload" for href in [assets["script"], *assets["modulepreload"]])
+		links.extend(
+			f"<{href}>; rel=preload; as=font; type=font/woff2; crossorigin" for href in assets["fonts"]
+		)
+	links.extend(f"<{quote(href, safe='/:')}>; rel=preload; as=image" for href in get_preload_images(route))
+	return ", ".join(links)
@@ -0,0 +1,291 @@
+# Copyright (c) 2025, ERP Lagbe and contributors
+# For license information, please see license.txt
+
+import time
+from functools import partial
+
+import frappe
+from pymysql.err import InterfaceError, OperationalError
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from travel_agency_website.http_cache import queue_cache_purge
+from travel_agency_website.local_cache import get_two_tier_value, publish_invalidation
+
+# Cached payloads register the tags they depend on (`blog:<slug>`, `seo:<route>`,
+# `cms:footer`, ...) so document hooks can drop just those entries.
+# Prefix of the Redis sets listing the cache keys registered under each tag
+CACHE_TAG_PREFIX = "travel_agency_website:cache_tag:"
+
+# Prefix of the keys holding a random token per tag, replaced whenever the tag is
+# invalidated; used as a cheap version of everything cached under the tag
+CACHE_TAG_VERSION_PREFIX = "travel_agency_website:cache_tag_version:"
+
+# Suffix of the keys holding the previous version of a cached payload
+STALE_SUFFIX = ":stale"
+
+SINGLE_FLIGHT_LOCK_PREFIX = "travel_agency_website:rebuild_lock:"
+SINGLE_FLIGHT_LOCK_TIMEOUT_MS = 10_000
+SINGLE_FLIGHT_WAIT = 3
+SINGLE_FLIGHT_POLL_INTERVAL = 0.05
+
+# Lifetime of a tagged value built while one of its inputs was a previous
+# version: the inputs' tags were already invalidated, so nothing else would
+# replace it
+STALE_DERIVED_TTL = 10
+
+# Degraded mode: a rebuild that fails, or takes longer than the latency budget,
+# counts as a failure; CIRCUIT_FAILURE_THRESHOLD failures within
+# CIRCUIT_FAILURE_WINDOW seconds open the circuit for CIRCUIT_OPEN_MS, during
+# which the previous version is served without attempting a rebuild. The budget,
+# in seconds, can be changed with the `travel_agency_website_rebuild_latency_budget`
+# site config key.
+REBUILD_LATENCY_BUDGET = 2
+REBUILD_LATENCY_BUDGET_CONFIG_KEY = "travel_agency_website_rebuild_latency_budget"
+CIRCUIT_FAILURES_PREFIX = "travel_agency_website:circuit_failures:"
+CIRCUIT_OPEN_PREFIX = "travel_agency_website:circuit_open:"
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_FAILURE_WINDOW = 30
+CIRCUIT_OPEN_MS = 15_000
+
+# Failures of the database or Redis, which the previous version papers over.
+# Anything else, such as a deleted or unpublished document, is raised.
+INFRASTRUCTURE_ERRORS = (
+	OperationalError,
+	InterfaceError,
+	frappe.QueryTimeoutError,
+	frappe.QueryDeadlockError,
+	RedisConnectionError,
+	RedisTimeoutError,
+	TimeoutError,
+	ConnectionError,
+)
+
+# Delete the lock only if it still holds our token
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+	return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def register_cache_tags(key, tags):
+	"""Record that the cache entry `key` depends on each of `tags`"""
+	cache = frappe.cache()
+	for tag in tags:
+		cache.sadd(CACHE_TAG_PREFIX + tag, key)
+
+
+def get_tagged_value(key, generator, tags, expires_in_sec=None, stale_copy=True):
+	"""Get a cached value, building it with `generator` and tagging it on a miss.
+
+	Reads go through the worker's local cache first. Misses go through
+	`single_flight`, so concurrent requests share one rebuild and may be
+	answered with the previous value while it runs. With `stale_copy=False` no
+	previous value is kept, for entries that must not outlive an invalidation.
+	"""
+	cache = frappe.cache()
+
+	def build():
+		versions = get_tag_versions(*tags)
+		value, built_from_stale = call_tracking_stale(generator)
+		if built_from_stale:
+			set_tagged_value(key, value, tags, STALE_DERIVED_TTL, stale_copy=False)
+		else:
+			set_tagged_value(key, value, tags, expires_in_sec, stale_copy=stale_copy)
+
+		# The value may predate a change committed while it was built. Tag versions
+		# change before entries are deleted, so checking after storing catches an
+		# invalidation that ran at any point of the build.
+		if get_tag_versions(*tags) != versions:
+			cache.delete_value(key)
+			publish_invalidation(cache.make_key(key))
+		return {"value": value}
+
+	# Values are stored wrapped in a dict so that a cached `None` is still a hit
+	cached = get_two_tier_value(key, ttl=get_remaining_ttl)
+	if cached is None:
+		cached = single_flight(
+			key,
+			# expires=True bypasses the per-request cache, which would remember the miss
+			partial(cache.get_value, key, expires=True),
+			build,
+			partial(cache.get_value, key + STALE_SUFFIX, expires=True) if stale_copy else None,
+		)
+
+	return cached["value"]
+
+
+def set_tagged_value(key, value, tags, expires_in_sec=None, stale_copy=True):
+	"""Cache `value` under `key` and register its tags. `None` values are cached too.
+
+	A copy without expiry is kept under the stale key for serving while rebuilding.
+	"""
+	cache = frappe.cache()
+	wrapped = {"value": value}
+	if expires_in_sec:
+		# Lets the local cache drop the value no later than Redis does
+		wrapped["expires_at"] = time.time() + expires_in_sec
+	cache.set_value(key, wrapped, expires_in_sec=expires_in_sec)
+	if stale_copy:
+		cache.set_value(key + STALE_SUFFIX, {"value": value})
+	register_cache_tags(key, tags)
+	publish_invalidation(cache.make_key(key))
+
+
+def get_remaining_ttl(wrapped):
+	"""Seconds left before a value stored by `set_tagged_value` expires in Redis, None if it does not"""
+	if wrapped.get("expires_at"):
+		return wrapped["expires_at"] - time.time()
+
+
+def single_flight(name, load, build, load_stale=None):
+	"""Rebuild a cache entry in one worker at a time.
+
+	`load` reads the entry (None on a miss), `build` rebuilds and stores it and
+	`load_stale` reads the previous version. The worker that takes the short
+	Redis lock rebuilds; others serve the previous version if there is one, or
+	poll for the new one for up to `SINGLE_FLIGHT_WAIT` seconds before building
+	it themselves.
+
+	If the rebuild fails, or the circuit for `name` is open after repeated
+	failures, the previous version is served too. Whenever the previous version
+	is served the request is flagged with `frappe.flags.served_stale`.
+	"""
+	cache = frappe.cache()
+	if load_stale and is_circuit_open(name):
+		stale = load_stale()
+		if stale is not None:
+			frappe.flags.served_stale = True
+			return stale
+
+	lock_key = cache.make_key(SINGLE_FLIGHT_LOCK_PREFIX + name)
+	token = frappe.generate_hash(length=16)
+
+	if cache.set(lock_key, token, nx=True, px=SINGLE_FLIGHT_LOCK_TIMEOUT_MS):
+		try:
+			return build_or_serve_stale(name, build, load_stale)
+		finally:
+			cache.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+
+	if load_stale:
+		stale = load_stale()
+		if stale is not None:
+			frappe.flags.served_stale = True
+			return stale
+
+	deadline = time.monotonic() + SINGLE_FLIGHT_WAIT
+	while time.monotonic() < deadline:
+		time.sleep(SINGLE_FLIGHT_POLL_INTERVAL)
+		value = load()
+		if value is not None:
+			return value
+
+	return build_or_serve_stale(name, build, load_stale)
+
+
+def build_or_serve_stale(name, build, load_stale=None):
+	"""Run `build`, falling back to the previous version if the database or Redis fails"""
+	start = time.monotonic()
+	try:
+		value = build()
+	except INFRASTRUCTURE_ERRORS:
+		record_circuit_failure(name)
+		stale = load_stale() if load_stale else None
+		if stale is None:
+			raise
+
+		frappe.log_error(f"Serving the previous {name} after a failed rebuild")
+		frappe.flags.served_stale = True
+		return stale
+
+	budget = frappe.conf.get(REBUILD_LATENCY_BUDGET_CONFIG_KEY) or REBUILD_LATENCY_BUDGET
+	if time.monotonic() - start > budget:
+		# Slow rebuilds count too, so a struggling database is not given more queries
+		record_circuit_failure(name)
+	return value
+
+
+def call_tracking_stale(fn):
+	"""Call `fn`, returning its result and whether it read the previous version of a cached entry"""
+	served_stale = frappe.flags.served_stale
+	frappe.flags.served_stale = False
+	try:
+		value = fn()
+		return value, bool(frappe.flags.served_stale)
+	finally:
+		frappe.flags.served_stale = served_stale or frappe.flags.served_stale
+
+
+def is_circuit_open(name):
+	cache = frappe.cache()
+	# `exists` applies `make_key` itself
+	return bool(cache.exists(CIRCUIT_OPEN_PREFIX + name))
+
+
+def record_circuit_failure(name):
+	"""Count a failed or slow rebuild of `name`, opening its circuit past the threshold"""
+	cache = frappe.cache()
+	failures_key = cache.make_key(CIRCUIT_FAILURES_PREFIX + name)
+	failures = cache.incr(failures_key)
+	if failures == 1:
+		cache.expire(failures_key, CIRCUIT_FAILURE_WINDOW)
+
+	if failures >= CIRCUIT_FAILURE_THRESHOLD:
+		cache.set(cache.make_key(CIRCUIT_OPEN_PREFIX + name), 1, px=CIRCUIT_OPEN_MS)
+		cache.delete(failures_key)
+
+
+def invalidate_cache_tags(*tags, drop_stale=False):
+	"""Delete every cache entry registered under any of `tags`.
+
+	With `drop_stale`, the stale copies of those entries are deleted too, so a
+	deleted or unpublished document is not served while its entries are rebuilt.
+	"""
+	if not tags:
+		return
+
+	cache = frappe.cache()
+	# Versions change first, see `get_tagged_value`
+	cache.mset(
+		{cache.make_key(CACHE_TAG_VERSION_PREFIX + tag): frappe.generate_hash(length=12) for tag in tags}
+	)
+
+	keys = []
+	for tag in tags:
+		tag_key = CACHE_TAG_PREFIX + tag
+		for key in cache.smembers(tag_key):
+			key = key.decode() if isinstance(key, bytes) else key
+			keys.append(key)
+			if drop_stale:
+				keys.append(key + STALE_SUFFIX)
+		keys.append(tag_key)
+
+	if keys:
+		cache.delete_value(keys)
+		publish_invalidation(*[cache.make_key(key) for key in keys])
+
+	queue_cache_purge(*tags)
+
+
+def get_tag_versions(*tags):
+	"""Current version token of each tag, which changes every time the tag is invalidated"""
+	if not tags:
+		return []
+
+	cache = frappe.cache()
+	keys = [cache.make_key(CACHE_TAG_VERSION_PREFIX + tag) for tag in tags]
+	versions = []
+	for key, version in zip(keys, cache.mget(keys), strict=True):
+		if version is None:
+			# Start from a random token so a flushed Redis cannot reissue an old version
+			cache.set(key, frappe.generate_hash(length=12), nx=True)
+			version = cache.get(key)
+		versions.append(version.decode())
+	return versions
+
+
+def invalidate_cache_tags_after_commit(*tags, drop_stale=False):
+	"""Invalidate `tags` once the current transaction commits"""
+	frappe.db.after_commit.add(partial(invalidate_cache_tags, *tags, drop_stale=drop_stale))
@@ -0,0 +1,382 @@
+# Copyright (c) 2025, ERP Lagbe and contributors
+# For license information, please see license.txt
+
+import base64
+import hashlib
+import json
+from functools import partial
+
+import frappe
+from frappe import _
+from frappe.utils import cint
+from werkzeug.wrappers import Response
+
+from travel_agency_website.cache import STALE_SUFFIX, invalidate_cache_tags_after_commit, single_flight
+from travel_agency_website.http_cache import mark_stale
+from travel_agency_website.local_cache import get_two_tier, publish_invalidation
+from travel_agency_website.snapshots import queue_snapshot_publish
+
+# Redis key holding the serialized package catalog
+CATALOG_CACHE_KEY = "travel_agency_website:catalog"
+CATALOG_VERSION_KEY = "travel_agency_website:catalog:version"
+# Incremented by every invalidation, so a rebuild can tell that it raced one
+CATALOG_GENERATION_KEY = "travel_agency_website:catalog:generation"
+
+# Only published & enabled items are part of the website catalog
+PUBLISHED_ITEM_FILTERS = {"disabled": 0, "custom_publish_on_website": 1}
+
+CATALOG_ITEM_FIELDS = [
+	"name",
+	"item_name",
+	"item_group",
+	"standard_rate",
+	"custom_website_price_to_show",
+	"image",
+	"custom_duration",
+	"custom_package_rating",
+	"custom_air_information",
+	"custom_food_information",
+	"custom_bustaxi_information",
+]
+
+# Scalar fields a package listing card needs
+CARD_FIELDS = [
+	"name",
+	"item_name",
+	"item_group",
+	"custom_website_price_to_show",
+	"image",
+	"custom_package_rating",
+	"custom_duration",
+]
+
+DEFAULT_PAGE_LENGTH = 20
+MAX_PAGE_LENGTH = 100
+
+# Packages read per query by the NDJSON export, which bounds its memory use
+EXPORT_BATCH_SIZE = 200
+
+# Child tables served with each package: (response key, child doctype, fields)
+PACKAGE_CHILD_TABLES = (
+	("custom_accommodation_list", "Accommodation List", ["hotel", "distance"]),
+	("custom_features", "Package Feature", ["title"]),
+	("custom_inclusions", "Title With Description", ["title", "description"]),
+	("custom_itinerary", "Title With Description", ["title", "description"]),
+	("custom_special_services", "Title With Description", ["title", "description"]),
+)
+
+PACKAGE_CHILD_KEYS = [key for key, _doctype, _fields in PACKAGE_CHILD_TABLES]
+
+
+def attach_package_child_tables(items, include=None):
+	"""Attach child table rows to each item using one query per child doctype.
+
+	Rows are fetched with ``parent IN (...)`` in `idx` order and grouped in
+	memory, so each item gets its rows in the order they have on the form.
+	`include` limits which child collections are loaded (all of them by default).
+	"""
+	tables = [table for table in PACKAGE_CHILD_TABLES if include is None or table[0] in include]
+	if not items or not tables:
+		return items
+
+	parents = [item.name for item in items]
+	tables_by_doctype = {}
+	for key, doctype, fields in tables:
+		tables_by_doctype.setdefault(doctype, []).append((key, fields))
+
+	grouped = {}
+	for doctype, tables in tables_by_doctype.items():
+		parentfields = [key for key, _fields in tables]
+		fields = list(dict.fromkeys(f for _key, table_fields in tables for f in table_fields))
+		filters = {"parenttype": "Item", "parent": ["in", parents]}
+		if len(tables) > 1:
+			filters["parentfield"] = ["in", parentfields]
+
+		rows = frappe.get_all(
+			doctype,
+			filters=filters,
+			fields=["parent", "parentfield", *fields],
+			order_by="idx asc",
+			ignore_permissions=True,
+		)
+		for row in rows:
+			parentfield = row.pop("parentfield")
+			key = parentfield if len(tables) > 1 else parentfields[0]
+			grouped.setdefault((row.pop("parent"), key), []).append(row)
+
+	for item in items:
+		for key, _doctype, fields in tables:
+			item[key] = [
+				frappe._dict({field: row.get(field) for field in fields})
+				for row in grouped.get((item.name, key), [])
+			]
+
+	return items
+
+
+def build_catalog(names=None, extra_fields=None):
+	"""Build the package catalog from the database.
+
+	`names` restricts the build to the given items (unpublished ones are left
+	out) and `extra_fields` adds Item fields that are not part of the snapshot.
+	"""
+	filters = dict(PUBLISHED_ITEM_FILTERS)
+	if names is not None:
+		if not names:
+			return []
+		filters["name"] = ["in", names]
+
+	items = frappe.get_all(
+		"Item",
+		filters=filters,
+		fields=CATALOG_ITEM_FIELDS + list(extra_fields or []),
+		ignore_permissions=True,
+	)
+	return attach_package_child_tables(items)
+
+
+def get_catalog_page(cursor=None, limit=DEFAULT_PAGE_LENGTH, fields=None, include=None, projection=None):
+	"""Get one page of published packages using keyset pagination.
+
+	Packages are ordered by (item_name, name), which is unique and stable, and
+	`cursor` is the opaque position of the last package on the previous page.
+	`fields` picks scalar fields and `include` picks child collections; the
+	"card" projection returns only what a listing card renders.
+	"""
+	limit = min(max(cint(limit) or DEFAULT_PAGE_LENGTH, 1), MAX_PAGE_LENGTH)
+	fields = parse_list_param(fields)
+	include = parse_list_param(include)
+
+	if projection == "card":
+		fields = fields or CARD_FIELDS
+		include = include or []
+	elif projection not in (None, "", "full"):
+		frappe.throw(_("Unknown projection: {0}").format(projection))
+
+	fields = fields or CATALOG_ITEM_FIELDS
+	include = PACKAGE_CHILD_KEYS if include is None else include
+
+	invalid = [f for f in fields if f not in CATALOG_ITEM_FIELDS] + [
+		key for key in include if key not in PACKAGE_CHILD_KEYS
+	]
+	if invalid:
+		frappe.throw(_("Unknown catalog fields: {0}").format(", ".join(invalid)))
+
+	after = decode_cursor(cursor) if cursor else None
+	items = get_published_items_after(fields, after, limit + 1)
+	has_more = len(items) > limit
+	items = items[:limit]
+	next_cursor = encode_cursor(items[-1].item_name, items[-1].name) if has_more else None
+
+	attach_package_child_tables(items, include)
+
+	returned = set(fields) | set(include) | {"name"}
+	for item in items:
+		for key in [key for key in item if key not in returned]:
+			del item[key]
+
+	return {
+		"error": None,
+		"data": items,
+		"next_cursor": next_cursor,
+		"total": frappe.db.count("Item", PUBLISHED_ITEM_FILTERS),
+	}
+
+
+def get_published_items_after(fields, after=None, limit=DEFAULT_PAGE_LENGTH):
+	"""Published items in (item_name, name) order, starting after the position `after`"""
+	Item = frappe.qb.DocType("Item")
+	select_fields = list(dict.fromkeys(["name", "item_name", *fields]))
+	query = (
+		frappe.qb.from_(Item)
+		.select(*[Item[f] for f in select_fields])
+		.where(Item.disabled == 0)
+		.where(Item.custom_publish_on_website == 1)
+		.orderby(Item.item_name)
+		.orderby(Item.name)
+		.limit(limit)
+	)
+
+	if after:
+		last_item_name, last_name = after
+		query = query.where(
+			(Item.item_name > last_item_name) | ((Item.item_name == last_item_name) & (Item.name > last_name))
+		)
+
+	return query.run(as_dict=True)
+
+
+def iter_catalog_batches(batch_size=EXPORT_BATCH_SIZE):
+	"""Yield the published packages with their child tables, `batch_size` at a time.
+
+	Each batch is one keyset query plus one query per child doctype, so memory
+	use depends on the batch size and not on the size of the catalog.
+	"""
+	after = None
+	while True:
+		items = get_published_items_after(CATALOG_ITEM_FIELDS, after, batch_size)
+		if not items:
+			return
+
+		yield attach_package_child_tables(items)
+		if len(items) < batch_size:
+			return
+		after = (items[-1].item_name, items[-1].name)
+
+
+def catalog_ndjson_response():
+	"""Stream the published packages as NDJSON, one package per line, as they are read"""
+
+	def generate():
+		# The body is sent after the request has closed its database connection
+		# (frappe.local itself lives until the body is read), so the stream opens
+		# the connection again and closes it when done
+		reconnect = frappe.db._conn is None
+		if reconnect:
+			frappe.db.connect()
+		try:
+			for items in iter_catalog_batches():
+				yield b"".join(
+					frappe.as_json(item, indent=None, separators=(",", ":")).encode() + b"\n"
+					for item in items
+				)
+		finally:
+			if reconnect:
+				frappe.db.close()
+
+	return Response(generate(), mimetype="application/x-ndjson")
+
+
+def parse_list_param(value):
+	"""Parse a list request param given as a JSON list or a comma separated string"""
+	if value is None or isinstance(value, list | tuple):
+		return value
+
+	value = value.strip()
+	if value.startswith("["):
+		return frappe.parse_json(value)
+
+	return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def encode_cursor(*values):
+	"""Encode a keyset position as an opaque URL-safe token"""
+	return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+	"""Decode a token produced by `encode_cursor`"""
+	try:
+		padded = cursor + "=" * (-len(cursor) % 4)
+		item_name, name = json.loads(base64.urlsafe_b64decode(padded.encode()))
+	except (TypeError, ValueError):
+		frappe.throw(_("Invalid cursor"))
+
+	return item_name, name
+
+
+def get_catalog_json():
+	"""Get the serialized catalog snapshot, rebuilding it in a single worker on a miss"""
+	cache = frappe.cache()
+	key = cache.make_key(CATALOG_CACHE_KEY)
+	payload = get_two_tier(key)
+	if payload is None:
+		payload = single_flight(
+			CATALOG_CACHE_KEY,
+			partial(cache.get, key),
+			lambda: store_catalog_snapshot()[0],
+			partial(cache.get, cache.make_key(CATALOG_CACHE_KEY + STALE_SUFFIX)),
+		)
+
+	return payload
+
+
+def get_catalog_version():
+	"""Get a short hash identifying the current catalog snapshot"""
+	cache = frappe.cache()
+	version = cache.get(cache.make_key(CATALOG_VERSION_KEY))
+	if version is None:
+		# The payload may be the previous snapshot while another worker rebuilds
+		return get_payload_version(get_catalog_json())
+
+	return version.decode()
+
+
+def get_payload_version(payload):
+	return hashlib.md5(payload).hexdigest()[:16]
+
+
+def get_catalog():
+	"""Get the package catalog snapshot as Python objects"""
+	return [frappe._dict(item) for item in json.loads(get_catalog_json())]
+
+
+def store_catalog_snapshot():
+	"""Build the catalog and store the serialized payload with its version"""
+	cache = frappe.cache()
+	generation_key = cache.make_key(CATALOG_GENERATION_KEY)
+	generation = cache.get(generation_key)
+	payload = frappe.as_json(build_catalog(), indent=None, separators=(",", ":")).encode()
+	version = get_payload_version(payload)
+	cache.mset(
+		{
+			cache.make_key(CATALOG_CACHE_KEY): payload,
+			cache.make_key(CATALOG_CACHE_KEY + STALE_SUFFIX): payload,
+			cache.make_key(CATALOG_VERSION_KEY): version,
+		}
+	)
+	# The payload may predate a change committed while it was built. The
+	# generation changes before the snapshot is deleted, so checking after
+	# storing catches an invalidation that ran at any point of the build.
+	if cache.get(generation_key) != generation:
+		cache.delete(cache.make_key(CATALOG_CACHE_KEY), cache.make_key(CATALOG_VERSION_KEY))
+	publish_invalidation(cache.make_key(CATALOG_CACHE_KEY))
+	return payload, version
+
+
+def catalog_body(payload=None):
+	"""The catalog (the cached one by default) in the standard `message` envelope, without decoding it"""
+	return b'{"message":{"error":null,"data":' + (payload or get_catalog_json()) + b"}}"
+
+
+def build_catalog_body():
+	"""Rebuild the catalog from the database and return it as `catalog_body` does"""
+	return catalog_body(store_catalog_snapshot()[0])
+
+
+def catalog_response():
+	return Response(mark_stale(catalog_body()), mimetype="application/json")
+
+
+def invalidate_catalog():
+	"""Drop the catalog snapshot so the next read rebuilds it (the stale copy is kept)"""
+	cache = frappe.cache()
+	cache.incr(cache.make_key(CATALOG_GENERATION_KEY))
+	cache.delete_value([CATALOG_CACHE_KEY, CATALOG_VERSION_KEY])
+	publish_invalidation(cache.make_key(CATALOG_CACHE_KEY))
+
+
+def on_catalog_change(doc, method=None, *args):
+	"""doc_events handler for Item and its package child tables.
+
+	Child rows are written as part of their parent Item, so in practice this runs
+	on Item save, rename and delete. The snapshot is dropped only after the
+	transaction commits so a concurrent read cannot cache uncommitted data.
+	"""
+	frappe.db.after_commit.add(invalidate_catalog)
+
+	# Package child rows carry their Item in `parent`; a rename also passes the old name
+	names = {doc.parent if doc.get("parenttype") == "Item" else doc.name}
+	# Stale copies of a deleted, unpublished or renamed package must not be served either
+	removed = set()
+	if method == "after_rename" and args:
+		removed.add(args[0])
+	if doc.doctype == "Item" and (
+		method == "on_trash" or doc.get("disabled") or not doc.get("custom_publish_on_website")
+	):
+		removed.add(doc.name)
+
+	invalidate_cache_tags_after_commit("sitemap", *[f"package:{name}" for name in names - removed])
+	if removed:
+		invalidate_cache_tags_after_commit(*[f"package:{name}" for name in removed], drop_stale=True)
+	queue_snapshot_publish("catalog")
@@ -0,0 +1,237 @@
+# Copyright (c) 2025, ERP Lagbe and contributors
+# For license information, please see license.txt
+
+from functools import partial
+
+import frappe
+from frappe import _
+from frappe.model import default_fields, no_value_fields, table_fields
+from werkzeug.wrappers import Response
+
+from travel_agency_website.cache import (
+	STALE_SUFFIX,
+	get_tagged_value,
+	invalidate_cache_tags_after_commit,
+	single_flight,
+)
+from travel_agency_website.catalog import get_payload_version, parse_list_param
+from travel_agency_website.http_cache import mark_stale
+from travel_agency_website.local_cache import get_two_tier, publish_invalidation
+from travel_agency_website.snapshots import queue_snapshot_publish
+
+# Prefix of the per-section cache keys, each tagged `cms:<section>`
+CMS_SECTION_CACHE_KEY_PREFIX = "travel_agency_website:cms_section:"
+
+# Serialized get_website_cms payload and the `modified` of the document it was built from
+CMS_PAYLOAD_CACHE_KEY = "travel_agency_website:cms_payload"
+CMS_PAYLOAD_VERSION_KEY = "travel_agency_website:cms_payload:version"
+
+# Website CMS fields grouped by the page section that renders them
+CMS_SECTIONS = {
+	"business": [
+		"title",
+		"business_name",
+		"business_phone",
+		"business_email",
+		"business_address",
+		"whatsapp_number",
+		"company_number",
+		"atol_number",
+		"atol_certificate_url",
+		"contact_card_rating",
+		"contact_card_rating_text",
+		"logo",
+	],
+	"navigation": ["navigation_dropdowns", "navigation_dropdown_items"],
+	"hero": ["sliders"],
+	"featured_packages": ["featured_packages_title", "featured_packages_subtitle", "featured_packages"],
+	"hajj_packages": ["hajj_deals_title", "hajj_packages"],
+	"statistics": [
+		"stat_hajj_travelers",
+		"stat_umrah_travelers",
+		"stat_satisfied_pilgrims",
+		"stat_years_experience",
+	],
+	"testimonials": ["testimonials_title", "testimonials_subtitle", "testimonials"],
+	"welcome": ["welcome_title", "welcome_description", "welcome_image"],
+	"packages_description": ["section_title", "description", "packages_image"],
+	"faq": ["faq_title", "faq_subtitle", "faq_items"],
+	"visa": ["visa_title", "visa_subtitle", "visa_background_image", "visa_sections"],
+	"about": [
+		"about_title",
+		"about_subtitle",
+		"about_background_image",
+		"about_story_title",
+		"about_story_description",
+		"about_sections",
+	],
+	"gallery": ["gallery_title", "gallery_subtitle", "gallery_images"],
+	"cta": ["cta_description"],
+	"footer": [
+		"footer_quick_links",
+		"footer_terms_links",
+		"footer_social_media",
+		"footer_copyright",
+		"footer_legal_text",
+	],
+	"terms": ["terms_title", "terms_content"],
+	"privacy": ["privacy_title", "privacy_content"],
+	"refund": ["refund_title", "refund_content"],
+}
+
+# Sections inlined into the SPA shell so the first render needs no API call
+BOOTSTRAP_SECTIONS = ["business", "navigation", "hero", "footer"]
+
+
+def serialize_row(row):
+	"""Child row as a plain dict of its data fields, keeping only `name` of the row metadata"""
+	data = {"name": row.name}
+	for df in row.meta.fields:
+		if df.fieldtype not in no_value_fields and df.fieldname not in default_fields:
+			data[df.fieldname] = row.get(df.fieldname)
+	return data
+
+
+def build_section(doc, section):
+	"""Serialize one section of the Website CMS document"""
+	data = {}
+	for fieldname in CMS_SECTIONS[section]:
+		df = doc.meta.get_field(fieldname)
+		if not df:
+			continue
+		if df.fieldtype in table_fields:
+			data[fieldname] = [serialize_row(row) for row in doc.get(fieldname)]
+		else:
+			data[fieldname] = doc.get(fieldname)
+	return data
+
+
+def get_cms_sections(sections=None):
+	"""Get the requested Website CMS sections, each cached on its own"""
+	sections = parse_list_param(sections) or list(CMS_SECTIONS)
+	unknown = [section for section in sections if section not in CMS_SECTIONS]
+	if unknown:
+		frappe.throw(_("Unknown Website CMS sections: {0}").format(", ".join(unknown)))
+
+	data = {}
+	for section in dict.fromkeys(sections):
+		data[section] = get_tagged_value(
+			f"{CMS_SECTION_CACHE_KEY_PREFIX}{section}",
+			partial(build_cms_section, section),
+			[f"cms:{section}"],
+		)
+
+	return data
+
+
+def get_bootstrap_json():
+	"""Above-the-fold sections as one flat JSON object, safe to inline in a <script> tag"""
+	data = {}
+	for section in get_cms_sections(BOOTSTRAP_SECTIONS).values():
+		data.update(section)
+
+	payload = frappe.as_json(data, indent=None, separators=(",", ":"))
+	return payload.replace("<", "\\u003c").replace(">", "\\u003e").replace("&", "\\u0026")
+
+
+def get_hero_image():
+	"""Image of the first active hero slide, the largest element of the home page's first paint"""
+	slides = [
+		slide for slide in get_cms_sections(["hero"])["hero"].get("sliders", []) if slide.get("is_active")
+	]
+	slides.sort(key=lambda slide: slide.get("slide_order") or 0)
+	return slides[0].get("slide_image") if slides else None
+
+
+def build_cms_section(section):
+	return build_section(frappe.get_cached_doc("Website CMS"), section)
+
+
+def get_changed_cms_sections(doc):
+	"""Sections whose content differs from the version before this save"""
+	previous = doc.get_doc_before_save()
+	if not previous:
+		return list(CMS_SECTIONS)
+
+	return [
+		section for section in CMS_SECTIONS if build_section(doc, section) != build_section(previous, section)
+	]
+
+
+def invalidate_cms_sections(doc):
+	"""Invalidate the cache tags of the sections changed by this save, after commit"""
+	invalidate_cache_tags_after_commit(*[f"cms:{section}" for section in get_changed_cms_sections(doc)])
+
+
+def serialize_cms_payload(doc):
+	"""Serialize the full Website CMS document the way get_website_cms returns it"""
+	return frappe.as_json({"docs": [doc.as_dict()]}, indent=None, separators=(",", ":")).encode()
+
+
+def store_cms_payload(payload, version):
+	"""Replace the cached payload and its version in one atomic write"""
+	cache = frappe.cache()
+	cache.mset(
+		{
+			cache.make_key(CMS_PAYLOAD_CACHE_KEY): payload,
+			cache.make_key(CMS_PAYLOAD_CACHE_KEY + STALE_SUFFIX): payload,
+			cache.make_key(CMS_PAYLOAD_VERSION_KEY): version,
+		}
+	)
+	publish_invalidation(cache.make_key(CMS_PAYLOAD_CACHE_KEY))
+
+
+def get_cms_payload():
+	"""Get the serialized Website CMS payload, building it from the document on a miss"""
+	cache = frappe.cache()
+	key = cache.make_key(CMS_PAYLOAD_CACHE_KEY)
+	payload = get_two_tier(key)
+	if payload is None:
+		payload = single_flight(
+			CMS_PAYLOAD_CACHE_KEY,
+			partial(cache.get, key),
+			build_cms_payload,
+			partial(cache.get, cache.make_key(CMS_PAYLOAD_CACHE_KEY + STALE_SUFFIX)),
+		)
+
+	return payload
+
+
+def get_cms_version():
+	"""Version of the cached payload, without reading the payload when it is known"""
+	cache = frappe.cache()
+	version = cache.get(cache.make_key(CMS_PAYLOAD_VERSION_KEY))
+	if version is None:
+		return get_payload_version(get_cms_payload())
+
+	return version.decode()
+
+
+def build_cms_payload():
+	"""Serialize the Website CMS document from the database and store it"""
+	doc = frappe.get_doc("Website CMS", "Website CMS", ignore_permissions=True)
+	payload = serialize_cms_payload(doc)
+	store_cms_payload(payload, str(doc.modified))
+	return payload
+
+
+def cms_payload_body(payload=None):
+	"""The payload (the cached one by default) in the standard `message` envelope, without decoding it"""
+	return b'{"message":' + (payload or get_cms_payload()) + b"}"
+
+
+def build_cms_payload_body():
+	"""Rebuild the payload from the database and return it as `cms_payload_body` does"""
+	return cms_payload_body(build_cms_payload())
+
+
+def cms_payload_response():
+	return Response(mark_stale(cms_payload_body()), mimetype="application/json")
+
+
+def refresh_cms_payload(doc):
+	"""Serialize the saved document now and publish it once the transaction commits"""
+	payload = serialize_cms_payload(doc)
+	version = str(doc.modified)
+	frappe.db.after_commit.add(lambda: store_cms_payload(payload, version))
+	queue_snapshot_publish("cms")
@@ -0,0 +1,36 @@
+# Copyright (c) 2025, ERP Lagbe and contributors
+# For license information, please see license.txt
+
+import click
+import frappe
+from frappe.commands import pass_context
+
+
+@click.command("warm-website-cache")
+@click.option(
+	"--now", is_flag=True, default=False, help="Build in this process instead of background workers"
+)
+@click.option("--timeout", type=int, default=300, help="Seconds to wait for the background jobs")
+@pass_context
+def warm_website_cache(context, now=False, timeout=300):
+	"""Rebuild the cached website payloads and report their build time and size"""
+	from travel_agency_website.warmup import warm_caches
+
+	for site in context.sites:
+		try:
+			frappe.init(site=site)
+			frappe.connect()
+			click.secho(f"Warming website caches for {site}", fg="green")
+			results = warm_caches(now=now, timeout=timeout)
+			for payload, result in results.items():
+				if "error" in result:
+					click.secho(f"  {payload:<14} failed: {result['error']}", fg="red")
+				elif "skipped" in result:
+					click.secho(f"  {payload:<14} skipped: {result['skipped']}", fg="yellow")
+				else:
+					click.echo(f"  {payload:<14} {result['time']:>8.3f}s {result['size']:>12,} bytes")
+		finally:
+			frappe.destroy()
+
+
+commands = [warm_website_cache]
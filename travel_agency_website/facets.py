@@ -0,0 +1,239 @@
+# Copyright (c) 2025, ERP Lagbe and contributors
+# For license information, please see license.txt
+
+import bisect
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt
+
+from travel_agency_website.catalog import (
+	DEFAULT_PAGE_LENGTH,
+	MAX_PAGE_LENGTH,
+	get_catalog,
+	get_catalog_version,
+	parse_list_param,
+)
+
+DEFAULT_PRICE_BAND = 500
+
+# Facets backed by posting lists, keyed by the filter name they answer
+FACET_FIELDS = ("item_group", "rating", "duration")
+
+SORT_OPTIONS = ("name", "price-low", "price-high")
+
+# Facet index per site, replaced whenever the catalog snapshot version changes
+_facet_indexes = {}
+
+
+def star_rating(rating):
+	"""Convert a Rating field value (0-1 fraction or 0-5) to whole stars like the listing page"""
+	rating = flt(rating)
+	if rating <= 1:
+		rating *= 5
+	return int(rating + 0.5)
+
+
+def iter_bits(bitmap):
+	"""Yield the positions of the set bits in ascending order"""
+	while bitmap:
+		lowest = bitmap & -bitmap
+		yield lowest.bit_length() - 1
+		bitmap ^= lowest
+
+
+class FacetIndex:
+	"""Bitmap posting lists over the published package catalog.
+
+	Bit `i` of a bitmap is set when the `i`-th package of the snapshot has the
+	value, so filters are ORs/ANDs of integers and facet counts are popcounts.
+	"""
+
+	def __init__(self, items):
+		self.items = items
+		self.all = (1 << len(items)) - 1
+		self.postings = {field: {} for field in FACET_FIELDS}
+		self.prices = [flt(item.custom_website_price_to_show) for item in items]
+		self.price_bands = {}
+
+		for i, item in enumerate(items):
+			bit = 1 << i
+			self.add("item_group", item.item_group, bit)
+			self.add("rating", star_rating(item.custom_package_rating), bit)
+			self.add("duration", (item.custom_duration or "").strip(), bit)
+
+		self.by_price = sorted(range(len(items)), key=lambda i: self.prices[i])
+		self.sorted_prices = [self.prices[i] for i in self.by_price]
+		self.orders = {
+			"name": sorted(range(len(items)), key=lambda i: (items[i].item_name or "").lower()),
+			"price-low": self.by_price,
+			"price-high": self.by_price[::-1],
+		}
+
+	def add(self, field, value, bit):
+		if value in (None, ""):
+			return
+		postings = self.postings[field]
+		postings[value] = postings.get(value, 0) | bit
+
+	def union(self, field, values):
+		bitmap = 0
+		for value in values:
+			bitmap |= self.postings[field].get(value, 0)
+		return bitmap
+
+	def price_range(self, price_min=None, price_max=None):
+		lo = 0 if price_min is None else bisect.bisect_left(self.sorted_prices, price_min)
+		hi = len(self.by_price) if price_max is None else bisect.bisect_right(self.sorted_prices, price_max)
+		bitmap = 0
+		for i in self.by_price[lo:hi]:
+			bitmap |= 1 << i
+		return bitmap
+
+	def get_price_bands(self, band):
+		"""Bitmaps of packages per price band of width `band`, built once per width"""
+		if band not in self.price_bands:
+			bands = {}
+			for i, price in enumerate(self.prices):
+				start = int(price // band) * band
+				bands[start] = bands.get(start, 0) | (1 << i)
+			self.price_bands[band] = dict(sorted(bands.items()))
+		return self.price_bands[band]
+
+	def query(self, clauses, dropdown_groups, sort, start, page_length, price_band):
+		"""Apply filter clauses and return the page plus disjunctive facet counts.
+
+		Each facet is counted against every filter except its own, so selecting a
+		rating still shows how many packages the other ratings would match.
+		"""
+
+		def mask(exclude=None):
+			bitmap = self.all
+			for name, clause in clauses.items():
+				if name != exclude:
+					bitmap &= clause
+			return bitmap
+
+		matched = mask()
+		facets = {}
+		for field in FACET_FIELDS:
+			field_mask = mask(field)
+			facets[field] = {
+				value: count
+				for value, bitmap in self.postings[field].items()
+				if (count := (bitmap & field_mask).bit_count())
+			}
+
+		dropdown_mask = mask("dropdown")
+		facets["dropdown"] = {
+			dropdown: count
+			for dropdown, groups in dropdown_groups.items()
+			if (count := (self.union("item_group", groups) & dropdown_mask).bit_count())
+		}
+
+		price_mask = mask("price")
+		facets["price"] = [
+			{"from": band_start, "to": band_start + price_band, "count": count}
+			for band_start, bitmap in self.get_price_bands(price_band).items()
+			if (count := (bitmap & price_mask).bit_count())
+		]
+
+		page = []
+		skipped = 0
+		for i in self.orders[sort]:
+			if not matched >> i & 1:
+				continue
+			if skipped < start:
+				skipped += 1
+				continue
+			page.append(self.items[i])
+			if len(page) >= page_length:
+				break
+
+		matched_prices = [self.prices[i] for i in iter_bits(price_mask)]
+		return {
+			"error": None,
+			"data": page,
+			"total": matched.bit_count(),
+			"facets": facets,
+			"price_range": {
+				"min": min(matched_prices) if matched_prices else None,
+				"max": max(matched_prices) if matched_prices else None,
+			},
+		}
+
+
+def get_facet_index():
+	"""Get the facet index for the current catalog snapshot, building it once per version"""
+	version = get_catalog_version()
+	cached = _facet_indexes.get(frappe.local.site)
+	if cached and cached[0] == version:
+		return cached[1]
+
+	index = FacetIndex(get_catalog())
+	_facet_indexes[frappe.local.site] = (version, index)
+	return index
+
+
+def get_dropdown_groups():
+	"""Map navigation dropdown names to their item groups from Website CMS"""
+	dropdown_groups = {}
+	for row in frappe.get_cached_doc("Website CMS").get("navigation_dropdown_items") or []:
+		if row.dropdown_name and row.item_group:
+			dropdown_groups.setdefault(row.dropdown_name, []).append(row.item_group)
+	return dropdown_groups
+
+
+def search_packages(
+	item_group=None,
+	dropdown=None,
+	rating=None,
+	price_min=None,
+	price_max=None,
+	duration=None,
+	sort="name",
+	start=0,
+	page_length=DEFAULT_PAGE_LENGTH,
+	price_band=DEFAULT_PRICE_BAND,
+):
+	"""Filter the published catalog and return one page with facet counts"""
+	if sort not in SORT_OPTIONS:
+		frappe.throw(_("Unknown sort option: {0}").format(sort))
+
+	index = get_facet_index()
+	dropdown_groups = get_dropdown_groups()
+	clauses = {}
+
+	if item_groups := parse_list_param(item_group):
+		clauses["item_group"] = index.union("item_group", item_groups)
+
+	if dropdowns := parse_list_param(dropdown):
+		wanted = {name.lower() for name in dropdowns}
+		groups = [
+			group
+			for name, dropdown_items in dropdown_groups.items()
+			if name.lower() in wanted
+			for group in dropdown_items
+		]
+		clauses["dropdown"] = index.union("item_group", groups)
+
+	if ratings := parse_list_param(rating):
+		clauses["rating"] = index.union("rating", [cint(r) for r in ratings])
+
+	if durations := parse_list_param(duration):
+		clauses["duration"] = index.union("duration", [d.strip() for d in durations])
+
+	if price_min not in (None, "") or price_max not in (None, ""):
+		clauses["price"] = index.price_range(
+			flt(price_min) if price_min not in (None, "") else None,
+			flt(price_max) if price_max not in (None, "") else None,
+		)
+
+	return index.query(
+		clauses,
+		dropdown_groups,
+		sort,
+		start=max(cint(start), 0),
+		page_length=min(max(cint(page_length) or DEFAULT_PAGE_LENGTH, 1), MAX_PAGE_LENGTH),
+		price_band=cint(price_band) if cint(price_band) > 0 else DEFAULT_PRICE_BAND,
+	)
@@ -88,6 +88,9 @@ app_license = "mit"
 # before_install = "travel_agency_website.install.before_install"
 # after_install = "travel_agency_website.install.after_install"
 
+# Rebuild cached website payloads in the background after every migrate
+after_migrate = ["travel_agency_website.warmup.after_migrate"]
+
 # Uninstallation
 # ------------
 
@@ -132,13 +135,45 @@ app_license = "mit"
 # ---------------
 # Hook on document methods and events
 
-# doc_events = {
-# 	"*": {
-# 		"on_update": "method",
-# 		"on_cancel": "method",
-# 		"on_trash": "method"
-# 	}
-# }
+doc_events = {
+	"Item": {
+		"on_update": [
+			"travel_agency_website.catalog.on_catalog_change",
+			"travel_agency_website.search.on_item_change",
+			"travel_agency_website.travel_agency_website.doctype.website_cms.website_cms.on_item_change",
+			"travel_agency_website.seo.on_route_change"
+		],
+		"after_rename": [
+			"travel_agency_website.catalog.on_catalog_change",
+			"travel_agency_website.search.on_item_change",
+			"travel_agency_website.travel_agency_website.doctype.website_cms.website_cms.on_item_change",
+			"travel_agency_website.seo.on_route_change"
+		],
+		"on_trash": [
+			"travel_agency_website.catalog.on_catalog_change",
+			"travel_agency_website.search.on_item_change",
+			"travel_agency_website.travel_agency_website.doctype.website_cms.website_cms.on_item_change",
+			"travel_agency_website.seo.on_route_change"
+		]
+	},
+	"Accommodation List": {
+		"on_update": "travel_agency_website.catalog.on_catalog_change",
+		"on_trash": "travel_agency_website.catalog.on_catalog_change"
+	},
+	"Package Feature": {
+		"on_update": "travel_agency_website.catalog.on_catalog_change",
+		"on_trash": "travel_agency_website.catalog.on_catalog_change"
+	},
+	"Title With Description": {
+		"on_update": "travel_agency_website.catalog.on_catalog_change",
+		"on_trash": "travel_agency_website.catalog.on_catalog_change"
+	},
+	"File": {
+		"after_insert": "travel_agency_website.package_details.on_file_change",
+		"on_update": "travel_agency_website.package_details.on_file_change",
+		"on_trash": "travel_agency_website.package_details.on_file_change"
+	}
+}
 
 # Scheduled Tasks
 # ---------------
@@ -258,6 +293,8 @@ website_route_rules = [
     {'from_route': '/blog/<path:app_path>', 'to_route': 'web'},
     {'from_route': '/blog', 'to_route': 'web'},
     {'from_route': '/terms', 'to_route': 'web'},
+    {'from_route': '/privacy', 'to_route': 'web'},
+    {'from_route': '/refund-policy', 'to_route': 'web'},
     {'from_route': '/branches', 'to_route': 'web'},
     {'from_route': '/category/<path:item_group>', 'to_route': 'web'},
     {'from_route': '/dashboard/<path:app_path>', 'to_route': 'dashboard'},
@@ -265,4 +302,6 @@ website_route_rules = [
     {'from_route': '/robots.txt', 'to_route': 'robots'},
     # problematic as it will catch all routes. Commenting in case breaks something!
     # {'from_route': '/<path:dropdown_name>', 'to_route': 'web'}
-]
\ No newline at end of file
+]
+# Serve the SPA shell routes above from the rendered-page cache
+page_renderer = ["travel_agency_website.page_cache.ShellPageRenderer"]
@@ -0,0 +1,207 @@
+# Copyright (c) 2025, ERP Lagbe and contributors
+# For license information, please see license.txt
+
+import hashlib
+import inspect
+from functools import wraps
+from urllib.parse import quote_plus
+
+import frappe
+import requests
+from werkzeug.wrappers import Response
+
+# Shared-cache lifetimes per endpoint group, in seconds. Browsers always revalidate
+# (max-age=0, answered with 304 by conditional_get); the reverse proxy or CDN keeps
+# responses for s_maxage, then serves them stale while refreshing or when Python fails.
+# Override per group in site config, e.g.
+#   "travel_agency_website_cache_policies": {"catalog": {"s_maxage": 300, "vary": "Accept-Language"}}
+# and disable shared caching of a group with {"s_maxage": 0}.
+CACHE_POLICIES = {
+	"cms": {"s_maxage": 300, "stale_while_revalidate": 86400, "stale_if_error": 86400},
+	"catalog": {"s_maxage": 60, "stale_while_revalidate": 600, "stale_if_error": 86400},
+	"blog": {"s_maxage": 300, "stale_while_revalidate": 3600, "stale_if_error": 86400},
+	"seo": {"s_maxage": 300, "stale_while_revalidate": 86400, "stale_if_error": 86400},
+	"sitemap": {"s_maxage": 3600, "stale_while_revalidate": 86400, "stale_if_error": 86400},
+}
+CACHE_POLICIES_CONFIG_KEY = "travel_agency_website_cache_policies"
+
+# Shared-cache lifetime of a previous version served while it is rebuilt or
+# because a rebuild failed (see `single_flight`): long enough to absorb traffic
+# while the database is down, short enough for the fresh payload to replace it.
+STALE_S_MAXAGE = 10
+
+# Site config key of the proxy purge endpoint, e.g. "http://127.0.0.1:8080/purge".
+# Cached paths are purged with a PURGE request to this URL followed by the path;
+# paths ending in `*` are prefixes, as understood by ngx_cache_purge.
+CACHE_PURGE_URL_CONFIG_KEY = "travel_agency_website_cache_purge_url"
+
+API_PATH = "/api/method/travel_agency_website.api."
+BLOG_API_PATH = "/api/method/travel_agency_website.travel_agency_website.api.blog."
+
+
+def get_accepted_kwargs(fn, kwargs):
+	"""Drop request parameters the endpoint does not take, such as `cmd`"""
+	parameters = inspect.signature(fn).parameters
+	return {key: value for key, value in kwargs.items() if key in parameters}
+
+
+def conditional_get(get_version):
+	"""Decorator answering `If-None-Match` with 304 for a whitelisted read endpoint.
+
+	`get_version` takes the endpoint's arguments and returns a cheap value that
+	changes whenever the response would, e.g. a catalog version or cache tag
+	versions. The strong ETag is derived from it and the arguments, and checked
+	before the endpoint runs, so an unchanged revalidation never builds the payload.
+	Error responses are sent without an ETag.
+	"""
+
+	def decorator(fn):
+		@wraps(fn)
+		def wrapper(**kwargs):
+			kwargs = get_accepted_kwargs(fn, kwargs)
+			etag = get_etag(fn, get_version(**kwargs), kwargs)
+			# If-None-Match uses weak comparison: nginx weakens the ETag when it gzips the response
+			if frappe.request and frappe.request.if_none_match.contains_weak(etag):
+				response = Response(status=304)
+				response.set_etag(etag)
+				return response
+
+			result = fn(**kwargs)
+			if is_error_result(result):
+				return result
+
+			response = to_response(result)
+			response.set_etag(etag)
+			return response
+
+		return wrapper
+
+	return decorator
+
+
+def cache_policy(name):
+	"""Decorator setting Cache-Control (and Vary) on a guest read endpoint from `CACHE_POLICIES`.
+
+	Responses to logged-in users are marked private, and error payloads are never stored.
+	A previous version served by `single_flight` carries a `Warning` header and is
+	kept by shared caches for `STALE_S_MAXAGE` seconds only.
+	"""
+
+	def decorator(fn):
+		@wraps(fn)
+		def wrapper(**kwargs):
+			result = fn(**get_accepted_kwargs(fn, kwargs))
+			response = to_response(result)
+			if is_error_result(result):
+				response.headers["Cache-Control"] = "no-store"
+			elif frappe.session.user != "Guest":
+				response.headers["Cache-Control"] = "private, no-cache"
+			else:
+				policy = get_cache_policy(name)
+				response.headers["Cache-Control"] = get_cache_control(policy)
+				if policy.get("vary"):
+					response.headers["Vary"] = policy["vary"]
+
+			if frappe.flags.served_stale and not is_error_result(result):
+				response.headers["Warning"] = '110 - "Response is Stale"'
+				if frappe.session.user == "Guest":
+					response.headers["Cache-Control"] = f"public, max-age=0, s-maxage={STALE_S_MAXAGE}"
+			return response
+
+		return wrapper
+
+	return decorator
+
+
+def get_cache_policy(name):
+	overrides = (frappe.conf.get(CACHE_POLICIES_CONFIG_KEY) or {}).get(name) or {}
+	return {**CACHE_POLICIES[name], **overrides}
+
+
+def get_cache_control(policy):
+	if not policy.get("s_maxage"):
+		return "no-cache"
+
+	directives = ["public", f"max-age={policy.get('max_age', 0)}", f"s-maxage={policy['s_maxage']}"]
+	if policy.get("stale_while_revalidate"):
+		directives.append(f"stale-while-revalidate={policy['stale_while_revalidate']}")
+	if policy.get("stale_if_error"):
+		directives.append(f"stale-if-error={policy['stale_if_error']}")
+	return ", ".join(directives)
+
+
+def get_purge_paths(tag):
+	"""Endpoint paths whose cached responses depend on the cache tag `tag`"""
+	kind, _, value = tag.partition(":")
+	if kind == "cms":
+		return [f"{API_PATH}get_website_cms", f"{API_PATH}get_website_cms_sections*"]
+	if kind == "package":
+		return [
+			f"{API_PATH}get_items_with_accommodation",
+			f"{API_PATH}get_package_catalog*",
+			f"{API_PATH}export_package_catalog",
+			f"{API_PATH}get_package_facets*",
+			f"{API_PATH}search_packages*",
+			f"{API_PATH}get_package_details?name={quote_plus(value, safe='')}",
+		]
+	if tag == "blog:index":
+		return [f"{BLOG_API_PATH}get_published_blogs"]
+	if kind == "blog":
+		return [f"{BLOG_API_PATH}get_blog_by_slug?slug={quote_plus(value, safe='')}"]
+	if tag == "seo:/":
+		# Every route without its own settings falls back to the home page
+		return [f"{API_PATH}get_seo_settings*"]
+	if kind == "seo":
+		return [f"{API_PATH}get_seo_settings?route={quote_plus(value, safe='')}"]
+	if kind == "sitemap":
+		return [f"{API_PATH}get_sitemap"]
+	return []
+
+
+def queue_cache_purge(*tags):
+	"""Purge the proxy's cached responses for `tags` in the background, if a purge URL is configured"""
+	if not frappe.conf.get(CACHE_PURGE_URL_CONFIG_KEY):
+		return
+
+	paths = list(dict.fromkeys(path for tag in tags for path in get_purge_paths(tag)))
+	if paths:
+		frappe.enqueue("travel_agency_website.http_cache.purge_paths", queue="short", paths=paths)
+
+
+def purge_paths(paths):
+	purge_url = frappe.conf.get(CACHE_PURGE_URL_CONFIG_KEY).rstrip("/")
+	for path in paths:
+		try:
+			requests.request("PURGE", purge_url + path, timeout=5)
+		except requests.RequestException:
+			frappe.log_error(f"Error purging {path} from the proxy cache")
+
+
+def get_etag(fn, version, kwargs):
+	key = repr((fn.__module__, fn.__qualname__, version, sorted(kwargs.items())))
+	return hashlib.md5(key.encode()).hexdigest()
+
+
+def is_error_result(result):
+	"""Whether an endpoint returned one of its error payloads, which must not be revalidated"""
+	return isinstance(result, dict) and (
+		bool(result.get("error")) or result.get("status") == "error" or result.get("success") is False
+	)
+
+
+def mark_stale(body):
+	"""Add `"stale": true` to a serialized `message` envelope if the request served a previous version"""
+	if not frappe.flags.served_stale:
+		return body
+	return body[:-1] + b',"stale":true}'
+
+
+def to_response(result):
+	"""The response Frappe would build for an endpoint's return value"""
+	if isinstance(result, Response):
+		return result
+
+	if frappe.response.get("type") == "xml":
+		return Response(result, mimetype="application/xml")
+
+	return Response(frappe.as_json({"message": result}, indent=None), mimetype="application/json")
@@ -0,0 +1,226 @@
+# Copyright (c) 2025, ERP Lagbe and contributors
+# For license information, please see license.txt
+
+import json
+import os
+import pickle
+import socket
+import threading
+import time
+from collections import OrderedDict
+
+import frappe
+
+# First tier in front of Redis for the hot read paths (CMS, SEO, blog, catalog):
+# a bounded LRU per worker process holding decoded values. Every write or delete
+# of a two-tier Redis key is broadcast on INVALIDATION_CHANNEL, and each worker
+# drops those keys from its LRU. Entries also expire after a TTL, which bounds
+# staleness if a broadcast is missed. Cached values are shared between requests
+# and must not be mutated.
+
+INVALIDATION_CHANNEL = "travel_agency_website:local_cache:invalidate"
+
+# Redis hash of per-worker counters, keyed by `<host>:<pid>`
+STATS_KEY = "travel_agency_website:local_cache:stats"
+STATS_FLUSH_INTERVAL = 30
+# Workers that have not reported for this long are left out of the totals
+STATS_MAX_AGE = 300
+
+# Defaults, overridable with the `travel_agency_website_local_cache` site config dict
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL = 60
+
+SUBSCRIBER_RETRY_INTERVAL = 1
+
+MISSING = object()
+
+_local_cache = None
+_subscriber_pid = None
+_stats_flushed_at = 0
+
+
+class LocalCache:
+	"""Thread-safe LRU with a TTL per entry and limits on entry count and total size"""
+
+	def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES, ttl=DEFAULT_TTL):
+		self.max_entries = max_entries
+		self.max_bytes = max_bytes
+		self.ttl = ttl
+		self.entries = OrderedDict()
+		self.size = 0
+		# Bumped by every invalidation, so a value read from Redis before an
+		# invalidation arrived is not stored after it
+		self.generation = 0
+		self.lock = threading.Lock()
+		self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+	def get(self, key):
+		with self.lock:
+			entry = self.entries.get(key)
+			if entry is None:
+				self.stats["misses"] += 1
+				return MISSING
+
+			value, _size, expires_at = entry
+			if expires_at < time.monotonic():
+				self._remove(key)
+				self.stats["expirations"] += 1
+				self.stats["misses"] += 1
+				return MISSING
+
+			self.entries.move_to_end(key)
+			self.stats["hits"] += 1
+			return value
+
+	def set(self, key, value, size, generation, ttl=None):
+		"""Store `value` for `ttl` seconds, capped at the cache's own TTL"""
+		ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+		if size > self.max_bytes:
+			return
+
+		with self.lock:
+			if generation != self.generation:
+				return
+
+			self._remove(key)
+			self.entries[key] = (value, size, time.monotonic() + ttl)
+			self.size += size
+			while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+				self._remove(next(iter(self.entries)))
+				self.stats["evictions"] += 1
+
+	def delete(self, keys):
+		with self.lock:
+			self.generation += 1
+			for key in keys:
+				if self._remove(key):
+					self.stats["invalidations"] += 1
+
+	def clear(self):
+		with self.lock:
+			self.generation += 1
+			self.entries.clear()
+			self.size = 0
+
+	def _remove(self, key):
+		entry = self.entries.pop(key, None)
+		if entry:
+			self.size -= entry[1]
+		return entry
+
+
+def get_local_cache():
+	global _local_cache
+	if _local_cache is None:
+		config = frappe.conf.get("travel_agency_website_local_cache") or {}
+		_local_cache = LocalCache(
+			max_entries=config.get("max_entries", DEFAULT_MAX_ENTRIES),
+			max_bytes=config.get("max_bytes", DEFAULT_MAX_BYTES),
+			ttl=config.get("ttl", DEFAULT_TTL),
+		)
+
+	return _local_cache
+
+
+def get_two_tier(redis_key, decode=None, ttl=None):
+	"""Get a raw Redis key through the local cache, decoded with `decode`; None on a miss.
+
+	`redis_key` is the full key, as returned by `make_key`. `ttl` is the local
+	lifetime in seconds, or a function of the decoded value returning it.
+	"""
+	ensure_subscriber()
+	flush_stats()
+	local_cache = get_local_cache()
+	value = local_cache.get(redis_key)
+	if value is not MISSING:
+		return value
+
+	generation = local_cache.generation
+	raw = frappe.cache().get(redis_key)
+	if raw is None:
+		return None
+
+	value = decode(raw) if decode else raw
+	local_cache.set(redis_key, value, len(raw), generation, ttl(value) if callable(ttl) else ttl)
+	return value
+
+
+def get_two_tier_value(key, ttl=None):
+	"""Two-tier counterpart of `frappe.cache().get_value` for keys written with `set_value`"""
+	return get_two_tier(frappe.cache().make_key(key), pickle.loads, ttl)
+
+
+def publish_invalidation(*redis_keys):
+	"""Drop full Redis keys from the local cache of every worker, this one included"""
+	if not redis_keys:
+		return
+
+	keys = [key.decode() if isinstance(key, bytes) else key for key in redis_keys]
+	get_local_cache().delete(keys)
+	frappe.cache().publish(INVALIDATION_CHANNEL, json.dumps(keys))
+
+
+def ensure_subscriber():
+	"""Start this process's invalidation listener, once per process (again after a fork)"""
+	global _subscriber_pid
+	if _subscriber_pid == os.getpid():
+		return
+
+	_subscriber_pid = os.getpid()
+	threading.Thread(
+		target=listen_for_invalidations,
+		args=(frappe.cache(),),
+		name="travel_agency_website_local_cache",
+		daemon=True,
+	).start()
+
+
+def listen_for_invalidations(redis):
+	while True:
+		try:
+			pubsub = redis.pubsub(ignore_subscribe_messages=True)
+			pubsub.subscribe(INVALIDATION_CHANNEL)
+			# Broadcasts sent before subscribing or while disconnected were missed
+			get_local_cache().clear()
+			for message in pubsub.listen():
+				get_local_cache().delete(json.loads(message["data"]))
+		except Exception:
+			time.sleep(SUBSCRIBER_RETRY_INTERVAL)
+
+
+def flush_stats():
+	"""Report this worker's counters to Redis, at most every `STATS_FLUSH_INTERVAL` seconds"""
+	global _stats_flushed_at
+	now = time.time()
+	if now - _stats_flushed_at < STATS_FLUSH_INTERVAL:
+		return
+
+	_stats_flushed_at = now
+	local_cache = get_local_cache()
+	frappe.cache().hset(
+		STATS_KEY,
+		f"{socket.gethostname()}:{os.getpid()}",
+		{
+			**local_cache.stats,
+			"entries": len(local_cache.entries),
+			"bytes": local_cache.size,
+			"reported_at": now,
+		},
+	)
+
+
+def get_stats():
+	"""Counters summed over the workers that reported recently, plus each worker's own"""
+	workers = {
+		worker.decode() if isinstance(worker, bytes) else worker: stats
+		for worker, stats in (frappe.cache().hgetall(STATS_KEY) or {}).items()
+		if time.time() - stats["reported_at"] < STATS_MAX_AGE
+	}
+	totals = {}
+	for stats in workers.values():
+		for counter, value in stats.items():
+			if counter != "reported_at":
+				totals[counter] = totals.get(counter, 0) + value
+
+	return {"total": totals, "workers": workers}
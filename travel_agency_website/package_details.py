@@ -0,0 +1,212 @@
+# Copyright (c) 2025, ERP Lagbe and contributors
+# For license information, please see license.txt
+
+import json
+from functools import partial
+
+import frappe
+from frappe import _
+from frappe.model import default_fields, no_value_fields
+
+from travel_agency_website.catalog import PUBLISHED_ITEM_FILTERS
+
+# Item fields rendered on the package detail page; fields missing on the site are skipped
+PACKAGE_DETAIL_FIELDS = [
+	"name",
+	"item_name",
+	"item_group",
+	"description",
+	"image",
+	"standard_rate",
+	"custom_website_price_to_show",
+	"published_in_website",
+	"custom_category",
+	"custom_country",
+	"custom_service_id",
+	"custom_processing_time",
+	"custom_duration",
+	"custom_package_rating",
+	"custom_air",
+	"custom_air_information",
+	"custom_hotel",
+	"custom_hotel_information",
+	"custom_accommodation",
+	"custom_accommodation_information",
+	"custom_bustaxi",
+	"custom_bustaxi_information",
+	"custom_food_child_food_except",
+	"custom_food_information",
+	"custom_education_qualification",
+	"custom_experience",
+	"custom_work_types",
+	"custom_salary",
+	"custom_meta_title",
+	"custom_meta_description",
+	"custom_meta_keywords",
+	"custom_og_image",
+	"custom_og_type",
+	"custom_robots_index",
+	"custom_robots_follow",
+]
+
+PACKAGE_DETAIL_TABLES = [
+	"custom_air_destination",
+	"custom_accommodation_list",
+	"custom_special_services",
+	"custom_features",
+	"custom_inclusions",
+	"custom_itinerary",
+]
+
+ACCOMMODATION_FILE_FIELDS = ["name", "file_name", "file_url", "is_private"]
+
+# Prefix of the per-accommodation File cache keys
+ACCOMMODATION_FILES_CACHE_KEY = "travel_agency_website:accommodation_files"
+
+# Prefix of the per-accommodation counters bumped whenever an attached File changes
+ACCOMMODATION_FILES_VERSION_KEY = "travel_agency_website:accommodation_files_version"
+
+
+def get_value_fields(doctype):
+	"""Data fields of `doctype`, without tables, layout fields or row metadata"""
+	return [
+		df.fieldname
+		for df in frappe.get_meta(doctype).fields
+		if df.fieldtype not in no_value_fields and df.fieldname not in default_fields
+	]
+
+
+def get_package_details(name):
+	"""Get a published package with its child tables, accommodations and their files.
+
+	Runs one query for the Item, one per child doctype, one for the linked
+	Accommodation records and one for their File attachments.
+	"""
+	meta = frappe.get_meta("Item")
+	fields = [f for f in PACKAGE_DETAIL_FIELDS if f == "name" or meta.has_field(f)]
+	package = frappe.get_all(
+		"Item",
+		filters={**PUBLISHED_ITEM_FILTERS, "name": name},
+		fields=fields,
+		limit=1,
+		ignore_permissions=True,
+	)
+	if not package:
+		frappe.throw(_("Package {0} not found").format(name), frappe.DoesNotExistError)
+
+	package = package[0]
+	attach_detail_tables(package, meta)
+
+	hotels = list(
+		dict.fromkeys(row.hotel for row in package.get("custom_accommodation_list", []) if row.hotel)
+	)
+	accommodations = get_accommodations(hotels)
+	files = get_accommodation_files_map(hotels)
+	for row in package.get("custom_accommodation_list", []):
+		if row.hotel:
+			row["hotel_details"] = accommodations.get(row.hotel)
+			row["images"] = files.get(row.hotel, [])
+
+	return package
+
+
+def attach_detail_tables(package, meta):
+	"""Load the package's child tables with one query per child doctype"""
+	tables_by_doctype = {}
+	for df in meta.get_table_fields():
+		if df.fieldname in PACKAGE_DETAIL_TABLES:
+			tables_by_doctype.setdefault(df.options, []).append(df.fieldname)
+			package[df.fieldname] = []
+
+	for doctype, parentfields in tables_by_doctype.items():
+		rows = frappe.get_all(
+			doctype,
+			filters={"parenttype": "Item", "parent": package.name, "parentfield": ["in", parentfields]},
+			fields=["name", "idx", "parentfield", *get_value_fields(doctype)],
+			order_by="idx asc",
+			ignore_permissions=True,
+		)
+		for row in rows:
+			package[row.pop("parentfield")].append(row)
+
+
+def get_accommodations(names):
+	"""Get Accommodation records by name in one query"""
+	if not names:
+		return {}
+
+	fields = ["name", *get_value_fields("Accommodation")]
+	rows = frappe.get_all(
+		"Accommodation",
+		filters={"name": ["in", names]},
+		fields=fields,
+		ignore_permissions=True,
+	)
+	return {row.name: row for row in rows}
+
+
+def get_accommodation_files_map(names):
+	"""Get File attachments for several accommodations, keyed by accommodation.
+
+	Each accommodation's files are cached in Redis with the version counter they
+	were read at, so a hotel shared by many packages is resolved once. The counters
+	are bumped by the File doc_events, which makes a cache hit a single `mget`; one
+	`attached_to_name IN (...)` query loads the accommodations that changed.
+	"""
+	names = list(dict.fromkeys(names))
+	files = {name: [] for name in names}
+	if not names:
+		return files
+
+	cache = frappe.cache()
+	keys = [cache.make_key(f"{ACCOMMODATION_FILES_VERSION_KEY}:{name}") for name in names]
+	keys += [cache.make_key(f"{ACCOMMODATION_FILES_CACHE_KEY}:{name}") for name in names]
+	values = cache.mget(keys)
+	versions = {name: int(version or 0) for name, version in zip(names, values[: len(names)], strict=True)}
+	stale = []
+	for name, cached in zip(names, values[len(names) :], strict=True):
+		cached = json.loads(cached) if cached else None
+		if cached and cached["version"] == versions[name]:
+			files[name] = cached["files"]
+		else:
+			stale.append(name)
+
+	if stale:
+		# Read after the versions, so files changed meanwhile are stored under an
+		# outdated version and read again next time
+		rows = frappe.get_all(
+			"File",
+			filters={"attached_to_doctype": "Accommodation", "attached_to_name": ["in", stale]},
+			fields=["attached_to_name", *ACCOMMODATION_FILE_FIELDS],
+			ignore_permissions=True,
+		)
+		for row in rows:
+			files[row.pop("attached_to_name")].append(row)
+
+		cache.mset(
+			{
+				cache.make_key(f"{ACCOMMODATION_FILES_CACHE_KEY}:{name}"): frappe.as_json(
+					{"version": versions[name], "files": files[name]}, indent=None
+				)
+				for name in stale
+			}
+		)
+
+	return files
+
+
+def bump_accommodation_files_versions(names):
+	cache = frappe.cache()
+	for name in names:
+		cache.incr(cache.make_key(f"{ACCOMMODATION_FILES_VERSION_KEY}:{name}"))
+
+
+def on_file_change(doc, method=None):
+	"""doc_events handler for File: outdate the cached files of the accommodations it is or was attached to"""
+	names = set()
+	for file in (doc, doc.get_doc_before_save()):
+		if file and file.attached_to_doctype == "Accommodation" and file.attached_to_name:
+			names.add(file.attached_to_name)
+
+	if names:
+		frappe.db.after_commit.add(partial(bump_accommodation_files_versions, names))
@@ -0,0 +1,87 @@
+# Copyright (c) 2025, ERP Lagbe and contributors
+# For license information, please see license.txt
+
+import hashlib
+import os
+from functools import partial
+
+import frappe
+from frappe.website.page_renderers.base_renderer import BaseRenderer
+from frappe.website.page_renderers.template_page import TemplatePage
+
+from travel_agency_website.assets import HOME_ROUTES, MANIFEST_PATH, get_link_header, get_shell_assets
+from travel_agency_website.cache import get_tagged_value
+from travel_agency_website.prerender import resolve_prerender
+from travel_agency_website.seo import get_route_map
+
+# Endpoint every SPA route resolves to through website_route_rules
+SHELL_ENDPOINT = "web"
+
+# Prefix of the rendered shell cache keys, per template version and route variant
+SHELL_CACHE_KEY_PREFIX = "travel_agency_website:shell:"
+
+# (mtimes, hash) of www/web.html and the Vite manifest, so a build with new
+# bundles gets new cache keys without restarting workers
+_shell_template_version = None
+
+
+class ShellPageRenderer(BaseRenderer):
+	"""Serve the SPA shell from a rendered-page cache.
+
+	The shell is the same for every user; the CSRF token is fetched from
+	`api.get_csrf_token` instead of being rendered into it. Routes with their
+	own head tags or prerendered content are cached separately, every other
+	route shares one entry. Entries are tagged `shell` plus the tags of the
+	prerendered content, and keep no previous version: a shell served after its
+	route was removed or renamed would carry the old head tags.
+	"""
+
+	def can_render(self):
+		return (
+			self.path == SHELL_ENDPOINT
+			and frappe.request.method == "GET"
+			and not frappe.conf.developer_mode
+			and not frappe.conf.disable_website_cache
+		)
+
+	def render(self):
+		route = "/" + frappe.request.path.strip("/")
+		prerender = resolve_prerender(route)
+		variant = route if prerender or route in get_route_map() or route in HOME_ROUTES else "*"
+
+		shell = get_tagged_value(
+			f"{SHELL_CACHE_KEY_PREFIX}{get_shell_template_version()}:{variant}",
+			partial(render_shell, self.path, route),
+			["shell", *(prerender[1] if prerender else [])],
+			stale_copy=False,
+		)
+		if shell["link"]:
+			self.headers = {"Link": shell["link"]}
+		return self.build_response(shell["html"])
+
+
+def render_shell(path, route):
+	"""Rendered shell HTML with the `Link` preload header for its route"""
+	page = TemplatePage(path)
+	page.can_render()
+	return {
+		"html": page.render().get_data(as_text=True),
+		"link": get_link_header(route, get_shell_assets()),
+	}
+
+
+def get_shell_template_version():
+	"""Hash of www/web.html and the Vite manifest, recomputed when either file changes"""
+	global _shell_template_version
+	paths = (os.path.join(os.path.dirname(__file__), "www", "web.html"), MANIFEST_PATH)
+	mtimes = tuple(os.path.getmtime(path) if os.path.exists(path) else None for path in paths)
+	if _shell_template_version and _shell_template_version[0] == mtimes:
+		return _shell_template_version[1]
+
+	version = hashlib.md5()
+	for path in paths:
+		if os.path.exists(path):
+			with open(path, "rb") as f:
+				version.update(f.read())
+	_shell_template_version = (mtimes, version.hexdigest()[:12])
+	return _shell_template_version[1]
@@ -0,0 +1,94 @@
+# Copyright (c) 2025, ERP Lagbe and contributors
+# For license information, please see license.txt
+
+from functools import partial
+
+import frappe
+
+from travel_agency_website.cache import get_tagged_value
+from travel_agency_website.cms import get_cms_sections
+from travel_agency_website.package_details import get_package_details
+from travel_agency_website.seo import PACKAGE_ROUTE_PREFIX, get_route_map
+from travel_agency_website.travel_agency_website.api.blog import get_blog_index
+
+# Prefix of the per-route prerendered HTML cache keys
+PRERENDER_CACHE_KEY_PREFIX = "travel_agency_website:prerender:"
+
+BLOG_ROUTE_PREFIX = "/blog/"
+
+# Legal page routes and the Website CMS section holding their text
+LEGAL_PAGES = {
+	"/terms": "terms",
+	"/privacy": "privacy",
+	"/refund-policy": "refund",
+}
+
+
+def get_prerendered_html(path):
+	"""Server-rendered body content for package, blog and legal pages, or None for other routes.
+
+	The HTML is cached per route under the same tags as the data it shows, so
+	saving the Item, Blog or Website CMS section regenerates it.
+	"""
+	route = "/" + (path or "").strip("/")
+	prerender = resolve_prerender(route)
+	if not prerender:
+		return None
+
+	builder, tags = prerender
+	return get_tagged_value(PRERENDER_CACHE_KEY_PREFIX + route, builder, tags)
+
+
+def resolve_prerender(route):
+	"""(builder, cache tags) of the prerendered content of `route`, or None if it has none"""
+	if route in LEGAL_PAGES:
+		section = LEGAL_PAGES[route]
+		return partial(render_legal_page, section), [f"cms:{section}"]
+
+	if route.startswith(PACKAGE_ROUTE_PREFIX):
+		# Only published packages, so unknown names are not cached
+		if route not in get_route_map():
+			return None
+		name = route[len(PACKAGE_ROUTE_PREFIX) :]
+		return partial(render_package_page, name), [f"package:{name}"]
+
+	if route.startswith(BLOG_ROUTE_PREFIX):
+		slug = route[len(BLOG_ROUTE_PREFIX) :]
+		if slug not in {blog.slug for blog in get_blog_index()}:
+			return None
+		return partial(render_blog_page, slug), [f"blog:{slug}"]
+
+	return None
+
+
+def render_package_page(name):
+	try:
+		package = get_package_details(name)
+	except frappe.DoesNotExistError:
+		return None
+
+	return frappe.render_template(
+		"travel_agency_website/templates/prerender/package.html", {"package": package}
+	)
+
+
+def render_blog_page(slug):
+	blog = frappe.get_all(
+		"Blog",
+		filters={"slug": slug, "published": 1},
+		fields=["title", "content", "featured_image", "author", "published_on"],
+		limit=1,
+		ignore_permissions=True,
+	)
+	if not blog:
+		return None
+
+	return frappe.render_template("travel_agency_website/templates/prerender/blog.html", {"blog": blog[0]})
+
+
+def render_legal_page(section):
+	data = get_cms_sections([section])[section]
+	return frappe.render_template(
+		"travel_agency_website/templates/prerender/legal.html",
+		{"title": data.get(f"{section}_title"), "content": data.get(f"{section}_content")},
+	)
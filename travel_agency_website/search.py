@@ -0,0 +1,216 @@
+# Copyright (c) 2025, ERP Lagbe and contributors
+# For license information, please see license.txt
+
+import bisect
+import heapq
+import html
+import math
+import re
+from collections import Counter
+from functools import partial
+
+import frappe
+from frappe.utils import cint, strip_html_tags
+
+from travel_agency_website.catalog import CARD_FIELDS, build_catalog
+
+# Redis list of item names changed since the index generation started
+SEARCH_LOG_KEY = "travel_agency_website:search:log"
+# Bumped when the change log is reset; workers then rebuild from scratch
+SEARCH_GENERATION_KEY = "travel_agency_website:search:generation"
+MAX_LOG_LENGTH = 500
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+MAX_PREFIX_EXPANSIONS = 50
+
+# How many times a term counts towards the score, per source field
+FIELD_WEIGHTS = {
+	"item_name": 3,
+	"custom_accommodation_list": 2,
+	"custom_features": 2,
+	"description": 1,
+	"custom_inclusions": 1,
+	"custom_itinerary": 1,
+}
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Search index per site: (generation, applied log entries, index)
+_search_indexes = {}
+
+
+def tokenize(text):
+	"""Lowercase word tokens of `text` with HTML tags and entities removed"""
+	if not text:
+		return []
+	return TOKEN_PATTERN.findall(html.unescape(strip_html_tags(str(text))).lower())
+
+
+def get_document_terms(item):
+	"""Weighted term frequencies of a catalog item across the searchable fields"""
+	texts = {
+		"item_name": [item.item_name],
+		"description": [item.description],
+		"custom_accommodation_list": [row.get("hotel") for row in item.custom_accommodation_list or []],
+		"custom_features": [row.get("title") for row in item.custom_features or []],
+		"custom_inclusions": [
+			text
+			for row in item.custom_inclusions or []
+			for text in (row.get("title"), row.get("description"))
+		],
+		"custom_itinerary": [
+			text for row in item.custom_itinerary or [] for text in (row.get("title"), row.get("description"))
+		],
+	}
+
+	terms = Counter()
+	for field, values in texts.items():
+		for value in values:
+			for token in tokenize(value):
+				terms[token] += FIELD_WEIGHTS[field]
+	return terms
+
+
+class SearchIndex:
+	"""In-memory inverted index over catalog items scored with BM25"""
+
+	k1 = 1.2
+	b = 0.75
+
+	def __init__(self):
+		self.postings = {}
+		self.terms = {}
+		self.lengths = {}
+		self.cards = {}
+		self.total_length = 0
+		self.vocabulary = None
+		self.norms = None
+
+	def add(self, item):
+		self.remove(item.name)
+		terms = get_document_terms(item)
+		for term, frequency in terms.items():
+			self.postings.setdefault(term, {})[item.name] = frequency
+
+		self.terms[item.name] = list(terms)
+		self.lengths[item.name] = sum(terms.values())
+		self.total_length += self.lengths[item.name]
+		self.cards[item.name] = {field: item.get(field) for field in CARD_FIELDS}
+		self.vocabulary = self.norms = None
+
+	def remove(self, name):
+		if name not in self.terms:
+			return
+
+		for term in self.terms.pop(name):
+			postings = self.postings[term]
+			postings.pop(name, None)
+			if not postings:
+				del self.postings[term]
+
+		self.total_length -= self.lengths.pop(name)
+		self.cards.pop(name)
+		self.vocabulary = self.norms = None
+
+	def expand(self, terms):
+		"""Query terms, with the last one also matching as a prefix for search-as-you-type"""
+		if self.vocabulary is None:
+			self.vocabulary = sorted(self.postings)
+
+		prefix = terms[-1]
+		start = bisect.bisect_left(self.vocabulary, prefix)
+		expansions = []
+		for term in self.vocabulary[start : start + MAX_PREFIX_EXPANSIONS]:
+			if not term.startswith(prefix):
+				break
+			expansions.append(term)
+
+		return list(dict.fromkeys([*terms, *expansions]))
+
+	def search(self, query, limit=DEFAULT_SEARCH_LIMIT):
+		terms = tokenize(query)
+		if not terms or not self.lengths:
+			return [], 0
+
+		count = len(self.lengths)
+		if self.norms is None:
+			# Length normalisation only changes when documents do, so keep it per document
+			average_length = self.total_length / count or 1
+			self.norms = {
+				name: self.k1 * (1 - self.b + self.b * length / average_length)
+				for name, length in self.lengths.items()
+			}
+
+		norms = self.norms
+		scores = {}
+		for term in self.expand(terms):
+			postings = self.postings.get(term)
+			if not postings:
+				continue
+
+			weight = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5)) * (self.k1 + 1)
+			for name, frequency in postings.items():
+				scores[name] = scores.get(name, 0) + weight * frequency / (frequency + norms[name])
+
+		ranked = heapq.nlargest(limit, scores.items(), key=lambda entry: entry[1])
+		return [{**self.cards[name], "score": round(score, 4)} for name, score in ranked], len(scores)
+
+
+def get_search_index():
+	"""Get the search index for this site, applying items changed since it was last used"""
+	cache = frappe.cache()
+	generation = cache.get(cache.make_key(SEARCH_GENERATION_KEY))
+	log_length = cache.llen(SEARCH_LOG_KEY)
+	cached = _search_indexes.get(frappe.local.site)
+
+	if not cached or cached[0] != generation or cached[1] > log_length:
+		index = SearchIndex()
+		for item in build_catalog(extra_fields=["description"]):
+			index.add(item)
+		_search_indexes[frappe.local.site] = (generation, log_length, index)
+		return index
+
+	_generation, applied, index = cached
+	if log_length > applied:
+		names = [name.decode() for name in cache.lrange(SEARCH_LOG_KEY, applied, log_length - 1)]
+		reindex_items(index, names)
+		_search_indexes[frappe.local.site] = (generation, log_length, index)
+
+	return index
+
+
+def reindex_items(index, names):
+	"""Refresh the given items in the index, dropping those no longer published"""
+	names = list(dict.fromkeys(names))
+	for name in names:
+		index.remove(name)
+	for item in build_catalog(names=names, extra_fields=["description"]):
+		index.add(item)
+
+
+def search_packages(query, limit=DEFAULT_SEARCH_LIMIT):
+	"""Rank published packages matching `query`"""
+	limit = min(max(cint(limit) or DEFAULT_SEARCH_LIMIT, 1), MAX_SEARCH_LIMIT)
+	results, total = get_search_index().search(query or "", limit)
+	return {"error": None, "data": results, "total": total}
+
+
+def log_search_changes(names):
+	"""Record changed items so every worker can update its index incrementally"""
+	cache = frappe.cache()
+	for name in names:
+		cache.rpush(SEARCH_LOG_KEY, name)
+
+	if cache.llen(SEARCH_LOG_KEY) > MAX_LOG_LENGTH:
+		cache.delete_value(SEARCH_LOG_KEY)
+		cache.incr(cache.make_key(SEARCH_GENERATION_KEY))
+
+
+def on_item_change(doc, method=None, *args):
+	"""doc_events handler queueing the Item (and its old name on rename) for reindexing"""
+	names = [doc.name]
+	if method == "after_rename" and args:
+		names.insert(0, args[0])
+
+	frappe.db.after_commit.add(partial(log_search_changes, names))
@@ -0,0 +1,228 @@
+# Copyright (c) 2025, ERP Lagbe and contributors
+# For license information, please see license.txt
+
+import json
+from functools import partial
+from html import escape
+
+import frappe
+from frappe.utils import cint, strip_html_tags
+
+from travel_agency_website.cache import call_tracking_stale, invalidate_cache_tags_after_commit
+from travel_agency_website.catalog import PUBLISHED_ITEM_FILTERS
+from travel_agency_website.cms import get_cms_sections
+
+# Bumped after SEO Settings or Items change so every worker rebuilds its route map
+SEO_ROUTES_VERSION_KEY = "travel_agency_website:seo_routes:version"
+SEO_ROUTE_MAP_CACHE_KEY = "travel_agency_website:seo_routes"
+
+PACKAGE_ROUTE_PREFIX = "/packages/"
+
+PACKAGE_META_FIELDS = [
+	"name",
+	"item_name",
+	"item_group",
+	"description",
+	"image",
+	"standard_rate",
+	"custom_duration",
+	"custom_package_rating",
+	"custom_meta_title",
+	"custom_meta_description",
+	"custom_meta_keywords",
+	"custom_og_image",
+	"custom_og_type",
+	"custom_robots_index",
+	"custom_robots_follow",
+]
+
+# Route map per site: (version, {route: head metadata})
+_route_maps = {}
+
+
+def get_route_map():
+	"""Get the head metadata of every SEO Settings route and package page, built once per version"""
+	cache = frappe.cache()
+	version = cache.get(cache.make_key(SEO_ROUTES_VERSION_KEY))
+	cached = _route_maps.get(frappe.local.site)
+	if cached and cached[0] == version:
+		return cached[1]
+
+	# Built once per version in Redis, so a new worker does not rebuild it
+	shared = cache.get_value(SEO_ROUTE_MAP_CACHE_KEY, expires=True)
+	if shared and shared["version"] == version:
+		route_map = shared["route_map"]
+	else:
+		route_map, built_from_stale = call_tracking_stale(partial(store_route_map, version))
+		if built_from_stale:
+			return route_map
+
+	_route_maps[frappe.local.site] = (version, route_map)
+	return route_map
+
+
+def store_route_map(version=None):
+	"""Build the route map and share it in Redis under the current version.
+
+	A map built from a previous version of the business section is not shared,
+	since nothing would replace it until the next version.
+	"""
+	cache = frappe.cache()
+	if version is None:
+		version = cache.get(cache.make_key(SEO_ROUTES_VERSION_KEY))
+	route_map, built_from_stale = call_tracking_stale(build_route_map)
+	if not built_from_stale:
+		cache.set_value(SEO_ROUTE_MAP_CACHE_KEY, {"version": version, "route_map": route_map})
+	return route_map
+
+
+def build_route_map():
+	route_map = {}
+	for name in frappe.get_all("SEO Settings", pluck="name", ignore_permissions=True):
+		seo = frappe.get_doc("SEO Settings", name).get_seo_data()
+		route_map[seo["page_route"]] = {
+			"title": seo["meta_title"],
+			"description": seo["meta_description"],
+			"keywords": seo["meta_keywords"],
+			"og_title": seo["og_title"],
+			"og_description": seo["og_description"],
+			"og_type": seo["og_type"],
+			"image": seo["og_image"],
+			"twitter_card": seo["twitter_card"],
+			"twitter_title": seo["twitter_title"],
+			"twitter_description": seo["twitter_description"],
+			"twitter_image": seo["twitter_image"],
+			"canonical_url": seo["canonical_url"],
+			"robots_index": seo["robots_index"],
+			"robots_follow": seo["robots_follow"],
+			"structured_data": seo["structured_data"],
+		}
+
+	business_name = get_cms_sections(["business"])["business"].get("business_name") or "Travel Agency"
+	meta = frappe.get_meta("Item")
+	fields = [f for f in PACKAGE_META_FIELDS if f == "name" or meta.has_field(f)]
+	for item in frappe.get_all(
+		"Item", filters=PUBLISHED_ITEM_FILTERS, fields=fields, ignore_permissions=True
+	):
+		route_map[PACKAGE_ROUTE_PREFIX + item.name] = get_package_meta(item, business_name)
+
+	return route_map
+
+
+def get_package_meta(item, business_name):
+	"""Head metadata of a package page, matching what the package page sets client-side"""
+	description = item.get("custom_meta_description")
+	if not description:
+		if item.description:
+			description = strip_html_tags(item.description)[:160]
+		else:
+			description = f"Book {item.item_name} - {item.item_group} package."
+
+	image = item.get("custom_og_image") or item.image
+	structured_data = {
+		"@context": "https://schema.org",
+		"@type": "TouristTrip",
+		"name": item.item_name,
+		"description": description,
+		"image": image,
+	}
+	if item.standard_rate:
+		structured_data["offers"] = {
+			"@type": "Offer",
+			"price": item.standard_rate,
+			"priceCurrency": "GBP",
+			"availability": "https://schema.org/InStock",
+		}
+
+	return {
+		"title": item.get("custom_meta_title") or f"{item.item_name} - Travel Package | {business_name}",
+		"description": description,
+		"keywords": item.get("custom_meta_keywords")
+		or f"{item.item_name}, {item.item_group}, travel package, tour",
+		"og_type": item.get("custom_og_type") or "product",
+		"image": image,
+		"robots_index": item.get("custom_robots_index", 1),
+		"robots_follow": item.get("custom_robots_follow", 1),
+		"structured_data": structured_data,
+	}
+
+
+def get_route_meta(path):
+	"""Head metadata for a request path, falling back to the home page settings"""
+	route = "/" + (path or "").strip("/")
+	route_map = get_route_map()
+	if route in route_map:
+		return {**route_map[route], "canonical_url": route_map[route].get("canonical_url") or get_url(route)}
+
+	# Pages without their own entry share the home page tags, minus its canonical
+	# URL, so the page cache can serve them one shell
+	if "/" in route_map:
+		return {**route_map["/"], "canonical_url": None}
+
+
+def render_head_tags(path):
+	"""Title, description, Open Graph, Twitter, canonical and JSON-LD tags for `path`, or None"""
+	meta = get_route_meta(path)
+	if not meta:
+		return None
+
+	site_url = frappe.utils.get_url()
+	canonical_url = meta.get("canonical_url")
+	image = get_absolute_url(meta.get("image"), site_url)
+
+	title = meta.get("title")
+	description = meta.get("description")
+	robots = "{},{}".format(
+		"index" if cint(meta.get("robots_index")) else "noindex",
+		"follow" if cint(meta.get("robots_follow")) else "nofollow",
+	)
+
+	tags = []
+	if title:
+		tags.append(f"<title>{escape(title)}</title>")
+	for attribute, name, content in (
+		("name", "description", description),
+		("name", "keywords", meta.get("keywords")),
+		("name", "robots", robots),
+		("property", "og:title", meta.get("og_title") or title),
+		("property", "og:description", meta.get("og_description") or description),
+		("property", "og:type", meta.get("og_type") or "website"),
+		("property", "og:url", canonical_url),
+		("property", "og:image", image),
+		("name", "twitter:card", meta.get("twitter_card") or "summary_large_image"),
+		("name", "twitter:title", meta.get("twitter_title") or title),
+		("name", "twitter:description", meta.get("twitter_description") or description),
+		("name", "twitter:image", get_absolute_url(meta.get("twitter_image"), site_url) or image),
+	):
+		if content:
+			tags.append(f'<meta {attribute}="{name}" content="{escape(str(content))}" />')
+
+	if canonical_url:
+		tags.append(f'<link rel="canonical" href="{escape(canonical_url)}" />')
+
+	if meta.get("structured_data"):
+		structured_data = json.dumps(meta["structured_data"], default=str).replace("<", "\\u003c")
+		tags.append(f'<script type="application/ld+json">{structured_data}</script>')
+
+	return "\n    ".join(tags)
+
+
+def get_url(route):
+	return frappe.utils.get_url() + (route if route != "/" else "")
+
+
+def get_absolute_url(url, site_url):
+	if url and not url.startswith("http"):
+		return f"{site_url}{url}"
+	return url
+
+
+def bump_route_map_version():
+	frappe.cache().incr(frappe.cache().make_key(SEO_ROUTES_VERSION_KEY))
+
+
+def on_route_change(doc=None, method=None, *args):
+	"""doc_events handler rebuilding the route map and cached shells after Items or SEO Settings change"""
+	frappe.db.after_commit.add(bump_route_map_version)
+	# Also drops previous versions stored before shells stopped keeping them
+	invalidate_cache_tags_after_commit("shell", drop_stale=True)
@@ -0,0 +1,103 @@
+# Copyright (c) 2025, ERP Lagbe and contributors
+# For license information, please see license.txt
+
+import hashlib
+import os
+from functools import partial
+
+import frappe
+
+# Heavy guest payloads published as immutable JSON files under the site's public
+# folder, which nginx serves directly. Each file holds the same body as the
+# endpoint it mirrors, so the frontend can read either one. Builders read the
+# database rather than the cache, which may still hold the previous payload
+# while another worker rebuilds it.
+SNAPSHOT_BUILDERS = {
+	"cms": "travel_agency_website.cms.build_cms_payload_body",
+	"catalog": "travel_agency_website.catalog.build_catalog_body",
+	"blog_index": "travel_agency_website.travel_agency_website.api.blog.blog_index_body",
+}
+
+# Folder inside `sites/<site>/public`, served at /snapshots/
+SNAPSHOT_FOLDER = "snapshots"
+
+# Redis hash of snapshot name to the URL of its current file
+SNAPSHOT_MANIFEST_KEY = "travel_agency_website:snapshot_manifest"
+
+# Set while a publish job for the snapshot is queued, so saves made meanwhile
+# share it. The job clears it before building, so a save made while it runs
+# queues another publish instead of being lost.
+SNAPSHOT_PENDING_KEY_PREFIX = "travel_agency_website:snapshot_pending:"
+SNAPSHOT_PENDING_TIMEOUT = 600
+
+
+def get_snapshot_path(filename=None):
+	path = frappe.get_site_path("public", SNAPSHOT_FOLDER)
+	return os.path.join(path, filename) if filename else path
+
+
+def get_snapshot_manifest():
+	"""URLs of the current snapshot files, publishing any that are missing"""
+	cache = frappe.cache()
+	manifest = {}
+	for snapshot in SNAPSHOT_BUILDERS:
+		url = cache.hget(SNAPSHOT_MANIFEST_KEY, snapshot)
+		if not url or not os.path.exists(get_snapshot_path(os.path.basename(url))):
+			url = publish_snapshot(snapshot)
+		manifest[snapshot] = url
+
+	return manifest
+
+
+def publish_snapshot(snapshot):
+	"""Write the snapshot to a content-hashed file and point the manifest at it.
+
+	Files are immutable: an unchanged payload maps to the existing file. The
+	previous file is kept for clients holding the old manifest; older ones are removed.
+	"""
+	payload = frappe.get_attr(SNAPSHOT_BUILDERS[snapshot])()
+	filename = f"{snapshot}.{hashlib.md5(payload).hexdigest()[:16]}.json"
+	path = get_snapshot_path(filename)
+
+	if not os.path.exists(path):
+		os.makedirs(get_snapshot_path(), exist_ok=True)
+		# Write to a temporary file first so nginx never serves a partial file
+		tmp_path = f"{path}.{frappe.generate_hash(length=8)}.tmp"
+		with open(tmp_path, "wb") as f:
+			f.write(payload)
+		os.replace(tmp_path, path)
+
+	cache = frappe.cache()
+	url = f"/{SNAPSHOT_FOLDER}/{filename}"
+	previous = cache.hget(SNAPSHOT_MANIFEST_KEY, snapshot)
+	cache.hset(SNAPSHOT_MANIFEST_KEY, snapshot, url)
+
+	keep = {filename, os.path.basename(previous or "")}
+	for existing in os.listdir(get_snapshot_path()):
+		if existing.startswith(f"{snapshot}.") and existing.endswith(".json") and existing not in keep:
+			os.remove(get_snapshot_path(existing))
+
+	return url
+
+
+def queue_snapshot_publish(*snapshots):
+	"""Republish the given snapshots in the background once the transaction commits"""
+	for snapshot in snapshots:
+		frappe.db.after_commit.add(partial(enqueue_snapshot_publish, snapshot))
+
+
+def enqueue_snapshot_publish(snapshot):
+	"""Queue a publish job unless one for the snapshot is queued and not started yet"""
+	cache = frappe.cache()
+	if cache.set(
+		cache.make_key(SNAPSHOT_PENDING_KEY_PREFIX + snapshot), 1, nx=True, ex=SNAPSHOT_PENDING_TIMEOUT
+	):
+		frappe.enqueue(
+			"travel_agency_website.snapshots.run_snapshot_publish", queue="short", snapshot=snapshot
+		)
+
+
+def run_snapshot_publish(snapshot):
+	cache = frappe.cache()
+	cache.delete(cache.make_key(SNAPSHOT_PENDING_KEY_PREFIX + snapshot))
+	publish_snapshot(snapshot)
@@ -0,0 +1,164 @@
+# Copyright (c) 2025, ERP Lagbe and contributors
+# For license information, please see license.txt
+
+from unittest.mock import Mock, patch
+
+import frappe
+from frappe.tests import IntegrationTestCase
+from pymysql.err import OperationalError
+
+from travel_agency_website.cache import (
+	CIRCUIT_FAILURE_THRESHOLD,
+	REBUILD_LATENCY_BUDGET_CONFIG_KEY,
+	SINGLE_FLIGHT_LOCK_PREFIX,
+	STALE_DERIVED_TTL,
+	STALE_SUFFIX,
+	get_tagged_value,
+	invalidate_cache_tags,
+	is_circuit_open,
+	single_flight,
+)
+
+
+class CacheTestCase(IntegrationTestCase):
+	"""Runs against the site's Redis, under keys unique to each test"""
+
+	def setUp(self):
+		self.name = f"test:{frappe.generate_hash(length=10)}"
+		self.tag = f"test:{frappe.generate_hash(length=10)}"
+		frappe.flags.served_stale = False
+
+	def tearDown(self):
+		cache = frappe.cache()
+		cache.delete_keys(f"*{self.name}")
+		cache.delete_keys(f"*{self.tag}")
+		frappe.flags.served_stale = False
+
+	def hold_lock(self):
+		cache = frappe.cache()
+		cache.set(cache.make_key(SINGLE_FLIGHT_LOCK_PREFIX + self.name), "other worker", px=10_000)
+
+
+class TestSingleFlight(CacheTestCase):
+	def test_builds_and_releases_the_lock(self):
+		build = Mock(return_value="fresh")
+		self.assertEqual(single_flight(self.name, Mock(), build, Mock(return_value="stale")), "fresh")
+		build.assert_called_once()
+		self.assertFalse(frappe.flags.served_stale)
+
+		cache = frappe.cache()
+		self.assertIsNone(cache.get(cache.make_key(SINGLE_FLIGHT_LOCK_PREFIX + self.name)))
+
+	def test_releases_the_lock_when_the_build_fails(self):
+		with self.assertRaises(frappe.ValidationError):
+			single_flight(self.name, Mock(), Mock(side_effect=frappe.ValidationError), None)
+
+		cache = frappe.cache()
+		self.assertIsNone(cache.get(cache.make_key(SINGLE_FLIGHT_LOCK_PREFIX + self.name)))
+
+	def test_serves_the_previous_version_while_another_worker_builds(self):
+		self.hold_lock()
+		build = Mock()
+		self.assertEqual(single_flight(self.name, Mock(), build, Mock(return_value="stale")), "stale")
+		build.assert_not_called()
+		self.assertTrue(frappe.flags.served_stale)
+
+	def test_waits_for_the_other_worker_without_a_previous_version(self):
+		self.hold_lock()
+		build = Mock()
+		load = Mock(side_effect=[None, "fresh"])
+		self.assertEqual(single_flight(self.name, load, build, Mock(return_value=None)), "fresh")
+		build.assert_not_called()
+		self.assertFalse(frappe.flags.served_stale)
+
+	def test_builds_itself_when_the_other_worker_takes_too_long(self):
+		self.hold_lock()
+		with patch("travel_agency_website.cache.SINGLE_FLIGHT_WAIT", 0.1):
+			self.assertEqual(
+				single_flight(self.name, Mock(return_value=None), Mock(return_value="fresh")), "fresh"
+			)
+
+
+class TestTaggedValue(CacheTestCase):
+	def test_caches_the_value_and_a_previous_version(self):
+		generator = Mock(return_value=None)
+		self.assertIsNone(get_tagged_value(self.name, generator, [self.tag]))
+		self.assertIsNone(get_tagged_value(self.name, generator, [self.tag]))
+		generator.assert_called_once()
+
+		cache = frappe.cache()
+		self.assertEqual(cache.get_value(self.name), {"value": None})
+		self.assertEqual(cache.get_value(self.name + STALE_SUFFIX), {"value": None})
+
+	def test_invalidation_drops_the_value(self):
+		get_tagged_value(self.name, Mock(return_value="old"), [self.tag])
+		invalidate_cache_tags(self.tag)
+		self.assertEqual(get_tagged_value(self.name, Mock(return_value="new"), [self.tag]), "new")
+
+	def test_invalidation_during_the_build_drops_the_stored_value(self):
+		def generator():
+			# A change committed while the value was being built
+			invalidate_cache_tags(self.tag)
+			return "built from old rows"
+
+		self.assertEqual(get_tagged_value(self.name, generator, [self.tag]), "built from old rows")
+		self.assertIsNone(frappe.cache().get_value(self.name))
+
+	def test_value_built_from_a_previous_version_expires_quickly(self):
+		def generator():
+			frappe.flags.served_stale = True
+			return "derived from stale"
+
+		self.assertEqual(get_tagged_value(self.name, generator, [self.tag]), "derived from stale")
+		self.assertTrue(frappe.flags.served_stale)
+
+		cache = frappe.cache()
+		self.assertLessEqual(cache.ttl(cache.make_key(self.name)), STALE_DERIVED_TTL)
+		self.assertIsNone(cache.get_value(self.name + STALE_SUFFIX))
+
+	def test_no_previous_version_without_stale_copy(self):
+		get_tagged_value(self.name, Mock(return_value="value"), [self.tag], stale_copy=False)
+		self.assertIsNone(frappe.cache().get_value(self.name + STALE_SUFFIX))
+
+
+class TestServeStale(CacheTestCase):
+	def test_serves_the_previous_version_when_the_database_fails(self):
+		build = Mock(side_effect=OperationalError(2013, "Lost connection to MySQL server"))
+		self.assertEqual(single_flight(self.name, Mock(), build, Mock(return_value="stale")), "stale")
+		self.assertTrue(frappe.flags.served_stale)
+
+	def test_raises_without_a_previous_version(self):
+		build = Mock(side_effect=OperationalError(2013, "Lost connection to MySQL server"))
+		with self.assertRaises(OperationalError):
+			single_flight(self.name, Mock(), build, Mock(return_value=None))
+
+	def test_raises_application_errors(self):
+		# A deleted or unpublished document must not be answered with its previous version
+		build = Mock(side_effect=frappe.DoesNotExistError)
+		with self.assertRaises(frappe.DoesNotExistError):
+			single_flight(self.name, Mock(), build, Mock(return_value="stale"))
+		self.assertFalse(frappe.flags.served_stale)
+		self.assertFalse(is_circuit_open(self.name))
+
+	def test_circuit_opens_after_repeated_failures(self):
+		build = Mock(side_effect=OperationalError(2013, "Lost connection to MySQL server"))
+		load_stale = Mock(return_value="stale")
+		for _ in range(CIRCUIT_FAILURE_THRESHOLD - 1):
+			single_flight(self.name, Mock(), build, load_stale)
+		self.assertFalse(is_circuit_open(self.name))
+
+		single_flight(self.name, Mock(), build, load_stale)
+		self.assertTrue(is_circuit_open(self.name))
+
+		# While open, the previous version is served without attempting a rebuild
+		build.reset_mock()
+		frappe.flags.served_stale = False
+		self.assertEqual(single_flight(self.name, Mock(), build, load_stale), "stale")
+		build.assert_not_called()
+		self.assertTrue(frappe.flags.served_stale)
+
+	def test_slow_rebuilds_count_as_failures(self):
+		with patch.dict(frappe.conf, {REBUILD_LATENCY_BUDGET_CONFIG_KEY: -1}):
+			for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+				self.assertEqual(single_flight(self.name, Mock(), Mock(return_value="fresh")), "fresh")
+		self.assertTrue(is_circuit_open(self.name))
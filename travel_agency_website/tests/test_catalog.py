@@ -0,0 +1,116 @@
+# Copyright (c) 2025, ERP Lagbe and contributors
+# For license information, please see license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase, UnitTestCase
+
+from travel_agency_website.cache import STALE_SUFFIX
+from travel_agency_website.catalog import (
+	CATALOG_CACHE_KEY,
+	CATALOG_VERSION_KEY,
+	PACKAGE_CHILD_TABLES,
+	attach_package_child_tables,
+	decode_cursor,
+	encode_cursor,
+	invalidate_catalog,
+	parse_list_param,
+	store_catalog_snapshot,
+)
+
+
+class TestCatalogParams(UnitTestCase):
+	def test_cursor_round_trip(self):
+		for position in (("Umrah Premium", "PKG-0001"), ("Ümrah / Hajj?", "PKG=2"), ("", "")):
+			cursor = encode_cursor(*position)
+			self.assertNotIn("=", cursor)
+			self.assertEqual(decode_cursor(cursor), position)
+
+	def test_invalid_cursor(self):
+		for cursor in ("not a cursor", encode_cursor("only one value")):
+			with self.assertRaises(frappe.ValidationError):
+				decode_cursor(cursor)
+
+	def test_parse_list_param(self):
+		self.assertIsNone(parse_list_param(None))
+		self.assertEqual(parse_list_param(["a"]), ["a"])
+		self.assertEqual(parse_list_param(' ["a", "b"] '), ["a", "b"])
+		self.assertEqual(parse_list_param("a, b,,c "), ["a", "b", "c"])
+		self.assertEqual(parse_list_param(""), [])
+
+
+class TestCatalogSnapshot(IntegrationTestCase):
+	def tearDown(self):
+		invalidate_catalog()
+
+	def get_cached(self, key):
+		cache = frappe.cache()
+		return cache.get(cache.make_key(key))
+
+	@patch("travel_agency_website.catalog.build_catalog", return_value=[{"name": "PKG-0001"}])
+	def test_stores_the_snapshot(self, _build_catalog):
+		payload, version = store_catalog_snapshot()
+		self.assertEqual(self.get_cached(CATALOG_CACHE_KEY), payload)
+		self.assertEqual(self.get_cached(CATALOG_CACHE_KEY + STALE_SUFFIX), payload)
+		self.assertEqual(self.get_cached(CATALOG_VERSION_KEY).decode(), version)
+
+	def test_invalidation_during_the_build_drops_the_snapshot(self):
+		def build_catalog():
+			# An Item change committed while the catalog was being built
+			invalidate_catalog()
+			return [{"name": "PKG-0001"}]
+
+		with patch("travel_agency_website.catalog.build_catalog", build_catalog):
+			payload, _version = store_catalog_snapshot()
+
+		self.assertIsNone(self.get_cached(CATALOG_CACHE_KEY))
+		self.assertIsNone(self.get_cached(CATALOG_VERSION_KEY))
+		# Kept for serving while the next read rebuilds
+		self.assertEqual(self.get_cached(CATALOG_CACHE_KEY + STALE_SUFFIX), payload)
+
+
+class TestPackageChildTables(IntegrationTestCase):
+	def setUp(self):
+		self.items = [self.make_item(f"_Test Package {frappe.generate_hash(length=6)}") for _ in range(2)]
+
+	def make_item(self, item_code):
+		item = frappe.get_doc(
+			{
+				"doctype": "Item",
+				"item_code": item_code,
+				"item_group": "All Item Groups",
+				"stock_uom": "Nos",
+				"is_stock_item": 0,
+			}
+		)
+		for key, _doctype, fields in PACKAGE_CHILD_TABLES:
+			for i in range(3):
+				item.append(key, {field: f"{item_code} {key} {field} {i}" for field in fields})
+		item.flags.ignore_links = True
+		item.flags.ignore_mandatory = True
+		item.insert(ignore_permissions=True)
+		# Rows as stored, after type casting
+		item.reload()
+
+		# Move the first row to the end, so `idx` order differs from insertion order
+		for key, doctype, _fields in PACKAGE_CHILD_TABLES:
+			rows = item.get(key)
+			frappe.db.set_value(doctype, rows[0].name, "idx", len(rows) + 1, update_modified=False)
+		return item
+
+	def test_rows_in_idx_order(self):
+		items = attach_package_child_tables([frappe._dict(name=item.name) for item in self.items])
+		for item, loaded in zip(self.items, items, strict=True):
+			for key, _doctype, fields in PACKAGE_CHILD_TABLES:
+				expected = [{field: row.get(field) for field in fields} for row in item.get(key)]
+				expected.append(expected.pop(0))
+				self.assertEqual(loaded[key], expected, key)
+
+	def test_one_query_per_child_doctype(self):
+		attach_package_child_tables([frappe._dict(name=item.name) for item in self.items])
+		with patch.object(frappe.db, "sql", wraps=frappe.db.sql) as sql:
+			attach_package_child_tables([frappe._dict(name=item.name) for item in self.items])
+
+		doctypes = {doctype for _key, doctype, _fields in PACKAGE_CHILD_TABLES}
+		self.assertEqual(sql.call_count, len(doctypes))
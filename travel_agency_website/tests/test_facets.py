@@ -0,0 +1,93 @@
+# Copyright (c) 2025, ERP Lagbe and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.tests import UnitTestCase
+
+from travel_agency_website.facets import FacetIndex, iter_bits, star_rating
+
+
+def make_item(name, item_group, price, rating, duration):
+	return frappe._dict(
+		name=name,
+		item_name=name,
+		item_group=item_group,
+		custom_website_price_to_show=price,
+		custom_package_rating=rating,
+		custom_duration=duration,
+	)
+
+
+class TestFacetIndex(UnitTestCase):
+	def setUp(self):
+		self.index = FacetIndex(
+			[
+				make_item("Umrah Economy", "Umrah", 900, 0.6, "7 Days"),
+				make_item("Umrah Premium", "Umrah", 1800, 1, "14 Days "),
+				make_item("Hajj Standard", "Hajj", 6500, 0.8, "21 Days"),
+				make_item("Hajj Deluxe", "Hajj", 9500, 1, "21 Days"),
+			]
+		)
+
+	def query(self, clauses=None, dropdown_groups=None, sort="name", start=0, page_length=20):
+		return self.index.query(clauses or {}, dropdown_groups or {}, sort, start, page_length, 1000)
+
+	def test_star_rating(self):
+		self.assertEqual(star_rating(0.6), 3)
+		self.assertEqual(star_rating(1), 5)
+		self.assertEqual(star_rating(4), 4)
+		self.assertEqual(star_rating(None), 0)
+
+	def test_iter_bits(self):
+		self.assertEqual(list(iter_bits(0b10110)), [1, 2, 4])
+		self.assertEqual(list(iter_bits(0)), [])
+
+	def test_unfiltered(self):
+		result = self.query()
+		self.assertEqual(result["total"], 4)
+		self.assertEqual(
+			[item.name for item in result["data"]],
+			["Hajj Deluxe", "Hajj Standard", "Umrah Economy", "Umrah Premium"],
+		)
+		self.assertEqual(result["facets"]["item_group"], {"Umrah": 2, "Hajj": 2})
+		self.assertEqual(result["facets"]["rating"], {3: 1, 5: 2, 4: 1})
+		self.assertEqual(result["facets"]["duration"], {"7 Days": 1, "14 Days": 1, "21 Days": 2})
+		self.assertEqual(result["price_range"], {"min": 900, "max": 9500})
+
+	def test_facets_exclude_their_own_filter(self):
+		result = self.query({"item_group": self.index.union("item_group", ["Umrah"])})
+		self.assertEqual(result["total"], 2)
+		# The selected facet still counts the other groups, the others are narrowed
+		self.assertEqual(result["facets"]["item_group"], {"Umrah": 2, "Hajj": 2})
+		self.assertEqual(result["facets"]["rating"], {3: 1, 5: 1})
+
+	def test_dropdown_facet(self):
+		dropdown_groups = {"Umrah Packages": ["Umrah"], "Hajj Packages": ["Hajj"]}
+		result = self.query({"rating": self.index.union("rating", [5])}, dropdown_groups)
+		self.assertEqual([item.name for item in result["data"]], ["Hajj Deluxe", "Umrah Premium"])
+		self.assertEqual(result["facets"]["dropdown"], {"Umrah Packages": 1, "Hajj Packages": 1})
+
+	def test_price_range_and_sorting(self):
+		clauses = {"price": self.index.price_range(1000, 7000)}
+		result = self.query(clauses, sort="price-low")
+		self.assertEqual([item.name for item in result["data"]], ["Umrah Premium", "Hajj Standard"])
+		result = self.query(clauses, sort="price-high")
+		self.assertEqual([item.name for item in result["data"]], ["Hajj Standard", "Umrah Premium"])
+		# Price facets and range ignore the price filter itself
+		self.assertEqual(result["price_range"], {"min": 900, "max": 9500})
+
+	def test_price_bands(self):
+		self.assertEqual(
+			self.query()["facets"]["price"],
+			[
+				{"from": 0, "to": 1000, "count": 1},
+				{"from": 1000, "to": 2000, "count": 1},
+				{"from": 6000, "to": 7000, "count": 1},
+				{"from": 9000, "to": 10000, "count": 1},
+			],
+		)
+
+	def test_pagination(self):
+		result = self.query(start=1, page_length=2)
+		self.assertEqual(result["total"], 4)
+		self.assertEqual([item.name for item in result["data"]], ["Hajj Standard", "Umrah Economy"])
@@ -0,0 +1,75 @@
+# Copyright (c) 2025, ERP Lagbe and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.tests import UnitTestCase
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Request
+
+from travel_agency_website.http_cache import (
+	API_PATH,
+	BLOG_API_PATH,
+	conditional_get,
+	get_cache_control,
+	get_purge_paths,
+)
+
+
+@conditional_get(lambda: "v1")
+def get_payload():
+	return {"data": [1, 2, 3]}
+
+
+class TestHTTPCache(UnitTestCase):
+	def test_purge_paths(self):
+		self.assertEqual(
+			get_purge_paths("cms:hero"),
+			[f"{API_PATH}get_website_cms", f"{API_PATH}get_website_cms_sections*"],
+		)
+		self.assertIn(
+			f"{API_PATH}get_package_details?name=Umrah+Premium%2FVIP",
+			get_purge_paths("package:Umrah Premium/VIP"),
+		)
+		self.assertEqual(get_purge_paths("blog:index"), [f"{BLOG_API_PATH}get_published_blogs"])
+		self.assertEqual(
+			get_purge_paths("blog:umrah-guide"), [f"{BLOG_API_PATH}get_blog_by_slug?slug=umrah-guide"]
+		)
+		self.assertEqual(get_purge_paths("seo:/"), [f"{API_PATH}get_seo_settings*"])
+		self.assertEqual(get_purge_paths("seo:/about"), [f"{API_PATH}get_seo_settings?route=%2Fabout"])
+		self.assertEqual(get_purge_paths("sitemap"), [f"{API_PATH}get_sitemap"])
+		self.assertEqual(get_purge_paths("shell"), [])
+
+	def test_cache_control(self):
+		self.assertEqual(
+			get_cache_control({"s_maxage": 60, "stale_while_revalidate": 600, "stale_if_error": 86400}),
+			"public, max-age=0, s-maxage=60, stale-while-revalidate=600, stale-if-error=86400",
+		)
+		self.assertEqual(get_cache_control({"s_maxage": 0}), "no-cache")
+
+
+class TestConditionalGet(UnitTestCase):
+	def setUp(self):
+		self.request = getattr(frappe.local, "request", None)
+
+	def tearDown(self):
+		frappe.local.request = self.request
+
+	def get(self, if_none_match=None):
+		headers = {"If-None-Match": if_none_match} if if_none_match else {}
+		frappe.local.request = Request(EnvironBuilder(headers=headers).get_environ())
+		return get_payload()
+
+	def test_revalidation(self):
+		response = self.get()
+		self.assertEqual(response.status_code, 200)
+		etag = response.headers["ETag"]
+
+		self.assertEqual(self.get(etag).status_code, 304)
+		self.assertEqual(self.get('"other"').status_code, 200)
+
+	def test_revalidation_with_weakened_etag(self):
+		# nginx turns the ETag into a weak one when it gzips the response
+		etag = self.get().headers["ETag"]
+		response = self.get(f"W/{etag}")
+		self.assertEqual(response.status_code, 304)
+		self.assertEqual(response.headers["ETag"], etag)
@@ -0,0 +1,83 @@
+# Copyright (c) 2025, ERP Lagbe and contributors
+# For license information, please see license.txt
+
+import time
+
+from frappe.tests import UnitTestCase
+
+from travel_agency_website.local_cache import MISSING, LocalCache
+
+
+class TestLocalCache(UnitTestCase):
+	def test_hit_and_miss(self):
+		cache = LocalCache()
+		self.assertIs(cache.get("a"), MISSING)
+		cache.set("a", 1, 10, cache.generation)
+		self.assertEqual(cache.get("a"), 1)
+		self.assertEqual(cache.stats["hits"], 1)
+		self.assertEqual(cache.stats["misses"], 1)
+		self.assertEqual(cache.size, 10)
+
+	def test_expiry(self):
+		cache = LocalCache(ttl=-1)
+		cache.set("a", 1, 10, cache.generation)
+		self.assertIs(cache.get("a"), MISSING)
+		self.assertEqual(cache.stats["expirations"], 1)
+		self.assertEqual(cache.size, 0)
+
+	def test_ttl_is_capped_by_the_cache_ttl(self):
+		cache = LocalCache(ttl=60)
+		cache.set("a", 1, 10, cache.generation, ttl=-1)
+		cache.set("b", 2, 10, cache.generation, ttl=3600)
+		self.assertIs(cache.get("a"), MISSING)
+		self.assertLessEqual(cache.entries["b"][2] - time.monotonic(), 60)
+
+	def test_evicts_least_recently_used(self):
+		cache = LocalCache(max_entries=2)
+		cache.set("a", 1, 1, cache.generation)
+		cache.set("b", 2, 1, cache.generation)
+		cache.get("a")
+		cache.set("c", 3, 1, cache.generation)
+		self.assertIs(cache.get("b"), MISSING)
+		self.assertEqual(cache.get("a"), 1)
+		self.assertEqual(cache.get("c"), 3)
+		self.assertEqual(cache.stats["evictions"], 1)
+
+	def test_evicts_by_size(self):
+		cache = LocalCache(max_bytes=100)
+		cache.set("a", 1, 60, cache.generation)
+		cache.set("b", 2, 60, cache.generation)
+		self.assertIs(cache.get("a"), MISSING)
+		self.assertEqual(cache.size, 60)
+
+		# Values larger than the whole cache are not stored
+		cache.set("c", 3, 101, cache.generation)
+		self.assertIs(cache.get("c"), MISSING)
+		self.assertEqual(cache.get("b"), 2)
+
+	def test_replacing_a_key_updates_the_size(self):
+		cache = LocalCache()
+		cache.set("a", 1, 10, cache.generation)
+		cache.set("a", 2, 30, cache.generation)
+		self.assertEqual(cache.get("a"), 2)
+		self.assertEqual(cache.size, 30)
+
+	def test_delete(self):
+		cache = LocalCache()
+		cache.set("a", 1, 10, cache.generation)
+		cache.delete(["a", "b"])
+		self.assertIs(cache.get("a"), MISSING)
+		self.assertEqual(cache.stats["invalidations"], 1)
+		self.assertEqual(cache.size, 0)
+
+	def test_value_read_before_an_invalidation_is_not_stored(self):
+		cache = LocalCache()
+		generation = cache.generation
+		cache.delete(["a"])
+		cache.set("a", 1, 10, generation)
+		self.assertIs(cache.get("a"), MISSING)
+
+		generation = cache.generation
+		cache.clear()
+		cache.set("a", 1, 10, generation)
+		self.assertIs(cache.get("a"), MISSING)
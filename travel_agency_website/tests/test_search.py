@@ -0,0 +1,66 @@
+# Copyright (c) 2025, ERP Lagbe and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.tests import UnitTestCase
+
+from travel_agency_website.search import SearchIndex, get_document_terms, tokenize
+
+
+def make_item(name, item_name, description="", features=()):
+	return frappe._dict(
+		name=name,
+		item_name=item_name,
+		item_group="Umrah",
+		description=description,
+		custom_accommodation_list=[],
+		custom_features=[{"title": title} for title in features],
+		custom_inclusions=[],
+		custom_itinerary=[],
+	)
+
+
+class TestSearchIndex(UnitTestCase):
+	def setUp(self):
+		self.index = SearchIndex()
+		self.index.add(make_item("PKG-1", "Makkah Premium", "Five star hotel near the Haram"))
+		self.index.add(make_item("PKG-2", "Economy Umrah", "Includes a day trip to Makkah"))
+		self.index.add(make_item("PKG-3", "Madinah Ziyarat", features=["Guided tour"]))
+
+	def search(self, query):
+		results, total = self.index.search(query)
+		return [result["name"] for result in results], total
+
+	def test_tokenize(self):
+		self.assertEqual(tokenize("<p>Makkah &amp; Madinah</p>"), ["makkah", "madinah"])
+		self.assertEqual(tokenize(None), [])
+
+	def test_document_terms_are_weighted_by_field(self):
+		terms = get_document_terms(make_item("PKG", "Umrah Deluxe", "Umrah visa", ["Umrah guide"]))
+		self.assertEqual(terms["umrah"], 3 + 1 + 2)
+		self.assertEqual(terms["visa"], 1)
+
+	def test_name_matches_rank_first(self):
+		self.assertEqual(self.search("makkah"), (["PKG-1", "PKG-2"], 2))
+
+	def test_last_term_matches_as_prefix(self):
+		self.assertEqual(self.search("mad"), (["PKG-3"], 1))
+		self.assertEqual(self.search("guided tou"), (["PKG-3"], 1))
+
+	def test_no_match(self):
+		self.assertEqual(self.search("hajj"), ([], 0))
+		self.assertEqual(self.search(""), ([], 0))
+
+	def test_re_adding_replaces_the_document(self):
+		self.index.add(make_item("PKG-1", "Hajj Premium"))
+		self.assertEqual(self.search("makkah"), (["PKG-2"], 1))
+		self.assertEqual(self.search("hajj"), (["PKG-1"], 1))
+
+	def test_remove(self):
+		total_length = self.index.total_length - self.index.lengths["PKG-2"]
+		self.index.remove("PKG-2")
+		self.assertEqual(self.search("makkah"), (["PKG-1"], 1))
+		self.assertEqual(self.index.total_length, total_length)
+		self.assertNotIn("trip", self.index.postings)
+		# Removing an unknown item is a no-op
+		self.index.remove("PKG-2")
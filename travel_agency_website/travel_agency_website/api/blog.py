@@ -4,29 +4,52 @@
 import frappe
 from frappe import _
 
+from travel_agency_website.cache import get_tag_versions, get_tagged_value
+from travel_agency_website.http_cache import cache_policy, conditional_get
+
+BLOG_INDEX_CACHE_KEY = "travel_agency_website:blog_index"
+BLOG_CACHE_KEY_PREFIX = "travel_agency_website:blog:"
+
+
+def build_published_blogs():
+	"""Published blog posts, newest first"""
+	return frappe.get_all(
+		"Blog",
+		fields=[
+			"name",
+			"title", 
+			"slug",
+			"content",
+			"featured_image",
+			"youtube_video_url",
+			"author",
+			"published_on",
+			"creation",
+			"modified"
+		],
+		filters=[["published", "=", 1]],
+		order_by="published_on desc"
+	)
+
+
+def get_blog_index():
+	return get_tagged_value(BLOG_INDEX_CACHE_KEY, build_published_blogs, ["blog:index"])
+
+
+def blog_index_body():
+	"""The get_published_blogs response body built from the database, for the blog index snapshot"""
+	return frappe.as_json(
+		{"message": {"status": "success", "data": build_published_blogs()}}, indent=None
+	).encode()
+
 
 @frappe.whitelist(allow_guest=True)
+@cache_policy("blog")
+@conditional_get(lambda: get_tag_versions("blog:index"))
 def get_published_blogs():
 	"""Get all published blog posts for frontend"""
 	try:
-		blogs = frappe.get_all(
-			"Blog",
-			fields=[
-				"name",
-				"title", 
-				"slug",
-				"content",
-				"featured_image",
-				"youtube_video_url",
-				"author",
-				"published_on",
-				"creation",
-				"modified"
-			],
-			filters=[["published", "=", 1]],
-			order_by="published_on desc"
-		)
-		
+		blogs = get_blog_index()
 		
 		return {
 			"status": "success",
@@ -41,15 +64,40 @@ def get_published_blogs():
 		}
 
 
+def get_published_slugs():
+	return {blog.slug for blog in get_blog_index()}
+
+
+def get_blog_version(slug):
+	"""Tag version of a published post. Other slugs use the blog index version, so
+	requests for arbitrary slugs do not create version keys."""
+	if slug in get_published_slugs():
+		return get_tag_versions(f"blog:{slug}")
+	return get_tag_versions("blog:index")
+
+
 @frappe.whitelist(allow_guest=True)
+@cache_policy("blog")
+@conditional_get(get_blog_version)
 def get_blog_by_slug(slug):
 	"""Get a specific blog post by slug"""
 	try:
-		blog = frappe.get_doc("Blog", {"slug": slug, "published": 1})
+		# Unknown slugs are answered from the index, without creating cache keys
+		if slug not in get_published_slugs():
+			return {
+				"status": "error",
+				"message": "Blog post not found"
+			}
+
+		blog = get_tagged_value(
+			f"{BLOG_CACHE_KEY_PREFIX}{slug}",
+			lambda: frappe.get_doc("Blog", {"slug": slug, "published": 1}).as_dict(),
+			[f"blog:{slug}"]
+		)
 		
 		return {
 			"status": "success",
-			"data": blog.as_dict()
+			"data": blog
 		}
 		
 	except frappe.DoesNotExistError:
@@ -5,6 +5,9 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import now
 
+from travel_agency_website.cache import invalidate_cache_tags_after_commit
+from travel_agency_website.snapshots import queue_snapshot_publish
+
 
 class Blog(Document):
 	"""Blog post for travel agency website"""
@@ -40,8 +43,24 @@ class Blog(Document):
 	
 	def on_update(self):
 		"""Called after the document is updated"""
-		# Clear cache to ensure frontend gets updated data
-		frappe.clear_cache()
+		# Invalidate only the cached payloads that depend on this post
+		self.invalidate_cache()
+	
+	def on_trash(self):
+		"""Called when the document is deleted"""
+		self.invalidate_cache(deleted=True)
+	
+	def invalidate_cache(self, deleted=False):
+		"""Drop cached payloads for this post (old and new slug), the blog index and the sitemap"""
+		invalidate_cache_tags_after_commit("blog:index", "sitemap")
+
+		# The stale copies of a deleted or unpublished post, or of its old slug,
+		# must not be served while the post's entries are rebuilt
+		previous = self.get_doc_before_save()
+		if previous and previous.slug and previous.slug != self.slug:
+			invalidate_cache_tags_after_commit(f"blog:{previous.slug}", drop_stale=True)
+		invalidate_cache_tags_after_commit(f"blog:{self.slug}", drop_stale=deleted or not self.published)
+		queue_snapshot_publish("blog_index")
 	
 	@frappe.whitelist()
 	def get_blog_data(self):
@@ -1,10 +1,19 @@
 # Copyright (c) 2025, ERP Lagbe and contributors
 # For license information, please see license.txt
 
-import frappe
 import json
+
+import frappe
 from frappe.model.document import Document
 
+from travel_agency_website.cache import get_tagged_value, invalidate_cache_tags_after_commit
+from travel_agency_website.seo import on_route_change
+
+SEO_CACHE_KEY_PREFIX = "travel_agency_website:seo:"
+
+# Routes that have their own SEO Settings record, tagged `seo_routes`
+SEO_ROUTES_CACHE_KEY = "travel_agency_website:seo_routes_with_settings"
+
 
 class SEOSettings(Document):
 	"""SEO Settings for managing page-level SEO metadata"""
@@ -32,8 +41,21 @@ class SEOSettings(Document):
 	
 	def on_update(self):
 		"""Called after the document is updated"""
-		# Clear cache to ensure frontend gets updated data
-		frappe.clear_cache()
+		# Invalidate only the cached SEO data for this route
+		self.invalidate_cache()
+	
+	def on_trash(self):
+		"""Called when the document is deleted"""
+		self.invalidate_cache()
+	
+	def invalidate_cache(self):
+		"""Drop cached SEO data for this route, including its previous route if it moved"""
+		tags = {f"seo:{self.page_route}", "seo_routes"}
+		previous = self.get_doc_before_save()
+		if previous and previous.page_route:
+			tags.add(f"seo:{previous.page_route}")
+		invalidate_cache_tags_after_commit(*tags)
+		on_route_change()
 	
 	@frappe.whitelist()
 	def get_seo_data(self):
@@ -78,33 +100,61 @@ class SEOSettings(Document):
 def get_seo_by_route(route):
 	"""Get SEO settings for a specific route"""
 	try:
-		# Normalize route
-		if not route.startswith('/'):
-			route = '/' + route
-		
-		# Try exact match first
-		seo_doc = frappe.get_all(
-			"SEO Settings",
-			filters={"page_route": route},
-			limit=1
-		)
+		# Routes without their own settings fall back to the home page settings and
+		# share its entry, so requests for arbitrary paths do not add cache keys
+		route = get_settings_route(route)
 		
-		if seo_doc:
-			doc = frappe.get_doc("SEO Settings", seo_doc[0].name)
-			return doc.get_seo_data()
-		
-		# Try to find default/home page
-		home_seo = frappe.get_all(
-			"SEO Settings",
-			filters={"page_route": "/"},
-			limit=1
+		return get_tagged_value(
+			f"{SEO_CACHE_KEY_PREFIX}{route}",
+			lambda: build_seo_for_route(route),
+			[f"seo:{route}"]
 		)
-		
-		if home_seo:
-			doc = frappe.get_doc("SEO Settings", home_seo[0].name)
-			return doc.get_seo_data()
-		
-		return None
 	except Exception as e:
 		frappe.log_error(f"Error fetching SEO settings: {str(e)}")
 		return None
+
+
+def get_routes_with_settings():
+	return get_tagged_value(
+		SEO_ROUTES_CACHE_KEY,
+		lambda: set(frappe.get_all("SEO Settings", pluck="page_route", ignore_permissions=True)),
+		["seo_routes"]
+	)
+
+
+def get_settings_route(route):
+	"""The normalized route if it has its own SEO Settings, otherwise the home page route"""
+	route = "/" + (route or "").removeprefix("/")
+	return route if route in get_routes_with_settings() else "/"
+
+
+def get_seo_route_tags(route):
+	"""Cache tags of the SEO data served for `route`"""
+	return ["seo_routes", f"seo:{get_settings_route(route)}"]
+
+
+def build_seo_for_route(route):
+	"""Resolve SEO data for a normalized route, falling back to the home page"""
+	# Try exact match first
+	seo_doc = frappe.get_all(
+		"SEO Settings",
+		filters={"page_route": route},
+		limit=1
+	)
+	
+	if seo_doc:
+		doc = frappe.get_doc("SEO Settings", seo_doc[0].name)
+		return doc.get_seo_data()
+	
+	# Try to find default/home page
+	home_seo = frappe.get_all(
+		"SEO Settings",
+		filters={"page_route": "/"},
+		limit=1
+	)
+	
+	if home_seo:
+		doc = frappe.get_doc("SEO Settings", home_seo[0].name)
+		return doc.get_seo_data()
+	
+	return None
@@ -4,6 +4,14 @@
 import frappe
 from frappe.model.document import Document
 
+from travel_agency_website.cms import invalidate_cms_sections, refresh_cms_payload
+from travel_agency_website.seo import on_route_change
+
+# Item fields shown on featured and Hajj package cards
+PACKAGE_CARD_FIELDS = ["name", "item_name", "description", "custom_website_price_to_show", "image"]
+
+PACKAGE_CARDS_CACHE_KEY = "travel_agency_website:cms_package_cards"
+
 
 class WebsiteCMS(Document):
 	"""Website CMS for managing all website content"""
@@ -21,8 +29,11 @@ class WebsiteCMS(Document):
 	
 	def on_update(self):
 		"""Called after the document is updated"""
-		# Clear cache to ensure frontend gets updated data
-		frappe.clear_cache()
+		# Refresh the cached payload and invalidate only the sections that changed
+		invalidate_cms_sections(self)
+		refresh_cms_payload(self)
+		# Package page titles include the business name
+		on_route_change()
 	
 	@frappe.whitelist()
 	def get_website_data(self):
@@ -144,35 +155,52 @@ class WebsiteCMS(Document):
 	
 	def get_featured_packages(self):
 		"""Get featured packages from ERPNext Items"""
-		packages = []
-		for pkg in self.featured_packages:
-			item = frappe.get_doc("Item", pkg.item)
-			packages.append({
-				"id": item.name,
-				"name": pkg.package_name,
-				"title": item.item_name,
-				"description": item.description,
-				"price": item.custom_website_price_to_show,
-				"image": item.image,
-				"display_order": pkg.display_order
-			})
-		return sorted(packages, key=lambda x: x["display_order"])
+		return self.get_package_cards()["featured"]
 	
 	def get_hajj_packages(self):
 		"""Get Hajj packages from ERPNext Items"""
-		packages = []
-		for pkg in self.hajj_packages:
-			item = frappe.get_doc("Item", pkg.item)
-			packages.append({
-				"id": item.name,
-				"name": pkg.package_name,
-				"title": item.item_name,
-				"description": item.description,
-				"price": item.custom_website_price_to_show,
-				"image": item.image,
-				"display_order": pkg.display_order
-			})
-		return sorted(packages, key=lambda x: x["display_order"])
+		return self.get_package_cards()["hajj"]
+	
+	def get_package_cards(self):
+		"""Hydrate featured and Hajj package rows with a single Item query
+		
+		The cards are cached until this document or one of the referenced Items changes.
+		"""
+		cached = frappe.cache().get_value(PACKAGE_CARDS_CACHE_KEY)
+		if cached and cached["modified"] == str(self.modified):
+			return cached
+		
+		rows = {"featured": self.featured_packages, "hajj": self.hajj_packages}
+		names = list({pkg.item for pkgs in rows.values() for pkg in pkgs if pkg.item})
+		items = {}
+		if names:
+			for item in frappe.get_all("Item",
+				filters={"name": ["in", names]},
+				fields=PACKAGE_CARD_FIELDS,
+				ignore_permissions=True
+			):
+				items[item.name] = item
+		
+		cards = {"modified": str(self.modified), "items": names}
+		for key, pkgs in rows.items():
+			packages = []
+			for pkg in pkgs:
+				item = items.get(pkg.item)
+				if not item:
+					continue
+				packages.append({
+					"id": item.name,
+					"name": pkg.package_name,
+					"title": item.item_name,
+					"description": item.description,
+					"price": item.custom_website_price_to_show,
+					"image": item.image,
+					"display_order": pkg.display_order
+				})
+			cards[key] = sorted(packages, key=lambda x: x["display_order"])
+		
+		frappe.cache().set_value(PACKAGE_CARDS_CACHE_KEY, cards)
+		return cards
 	
 	def get_testimonials(self):
 		"""Get testimonials"""
@@ -257,3 +285,11 @@ def get_website_cms_data():
 	
 	doc = frappe.get_doc("Website CMS", website_cms[0].name)
 	return doc.get_website_data()
+
+
+def on_item_change(doc, method=None, *args):
+	"""Drop the cached package cards after commit when a referenced Item changes"""
+	cached = frappe.cache().get_value(PACKAGE_CARDS_CACHE_KEY)
+	names = {doc.name, *args[:1]}
+	if cached and names & set(cached["items"]):
+		frappe.db.after_commit.add(lambda: frappe.cache().delete_value(PACKAGE_CARDS_CACHE_KEY))
@@ -0,0 +1,139 @@
+# Copyright (c) 2025, ERP Lagbe and contributors
+# For license information, please see license.txt
+
+import os
+import time
+
+import frappe
+
+from travel_agency_website.api import SITEMAP_CACHE_KEY, build_sitemap_xml
+from travel_agency_website.cache import set_tagged_value
+from travel_agency_website.catalog import store_catalog_snapshot
+from travel_agency_website.cms import (
+	CMS_SECTION_CACHE_KEY_PREFIX,
+	CMS_SECTIONS,
+	build_cms_payload,
+	build_cms_section,
+)
+from travel_agency_website.seo import store_route_map
+from travel_agency_website.snapshots import SNAPSHOT_BUILDERS, get_snapshot_path, publish_snapshot
+from travel_agency_website.travel_agency_website.api.blog import BLOG_INDEX_CACHE_KEY, build_published_blogs
+
+# Redis hash of `<payload>: result` per warm-up run
+WARMUP_RESULTS_KEY = "travel_agency_website:warmup:"
+WARMUP_RESULTS_EXPIRY = 3600
+WARMUP_POLL_INTERVAL = 0.5
+
+
+def warm_cms_payload():
+	return len(build_cms_payload())
+
+
+def warm_cms_sections():
+	size = 0
+	for section in CMS_SECTIONS:
+		data = build_cms_section(section)
+		set_tagged_value(f"{CMS_SECTION_CACHE_KEY_PREFIX}{section}", data, [f"cms:{section}"])
+		size += len(frappe.as_json(data, indent=None))
+	return size
+
+
+def warm_catalog():
+	return len(store_catalog_snapshot()[0])
+
+
+def warm_sitemap():
+	xml = build_sitemap_xml()
+	set_tagged_value(SITEMAP_CACHE_KEY, xml, ["sitemap"], expires_in_sec=86400)
+	return len(xml)
+
+
+def warm_seo_routes():
+	return len(frappe.as_json(store_route_map(), indent=None))
+
+
+def warm_blog_index():
+	blogs = build_published_blogs()
+	set_tagged_value(BLOG_INDEX_CACHE_KEY, blogs, ["blog:index"])
+	return len(frappe.as_json(blogs, indent=None))
+
+
+def warm_snapshots():
+	return sum(
+		os.path.getsize(get_snapshot_path(os.path.basename(publish_snapshot(snapshot))))
+		for snapshot in SNAPSHOT_BUILDERS
+	)
+
+
+# Payload name: function building and storing it, returning its size in bytes
+WARMERS = {
+	"cms_payload": warm_cms_payload,
+	"cms_sections": warm_cms_sections,
+	"catalog": warm_catalog,
+	"sitemap": warm_sitemap,
+	"seo_routes": warm_seo_routes,
+	"blog_index": warm_blog_index,
+	"snapshots": warm_snapshots,
+}
+
+# Payloads holding absolute URLs. Outside a request `get_url` knows the site's
+# domain only from the `host_name` site config, so these are skipped without it
+# and built by the first request instead.
+URL_WARMERS = ("sitemap", "seo_routes")
+
+
+def warm_caches(now=False, wait=True, timeout=300):
+	"""Rebuild every cached website payload, as one background job each unless `now`.
+
+	Returns `{payload: {"time": seconds, "size": bytes}}`, `{"error": ...}` for a
+	payload that failed or `{"skipped": ...}` for one that was not built, once all
+	jobs finished or `timeout` seconds passed.
+	"""
+	run_id = frappe.generate_hash(length=10)
+	if now:
+		for payload in WARMERS:
+			run_warmer(payload, run_id)
+	else:
+		for payload in WARMERS:
+			frappe.enqueue(
+				"travel_agency_website.warmup.run_warmer", queue="short", payload=payload, run_id=run_id
+			)
+		if not wait:
+			return None
+
+	cache = frappe.cache()
+	deadline = time.monotonic() + timeout
+	while True:
+		results = {
+			(payload.decode() if isinstance(payload, bytes) else payload): result
+			for payload, result in (cache.hgetall(WARMUP_RESULTS_KEY + run_id) or {}).items()
+		}
+		if len(results) == len(WARMERS) or time.monotonic() > deadline:
+			break
+		time.sleep(WARMUP_POLL_INTERVAL)
+
+	cache.delete_value(WARMUP_RESULTS_KEY + run_id)
+	return {payload: results.get(payload, {"error": "Timed out"}) for payload in WARMERS}
+
+
+def run_warmer(payload, run_id):
+	"""Build one payload and record its build time and size for the run"""
+	start = time.monotonic()
+	try:
+		if payload in URL_WARMERS and not frappe.conf.host_name:
+			result = {"skipped": "host_name is not set in site config"}
+		else:
+			result = {"size": WARMERS[payload]()}
+	except Exception as e:
+		frappe.log_error(f"Error warming {payload} cache")
+		result = {"error": str(e)}
+	result["time"] = round(time.monotonic() - start, 3)
+
+	cache = frappe.cache()
+	cache.hset(WARMUP_RESULTS_KEY + run_id, payload, result)
+	cache.expire(cache.make_key(WARMUP_RESULTS_KEY + run_id), WARMUP_RESULTS_EXPIRY)
+
+
+def after_migrate():
+	"""Queue the warm-up so the first visitors after a deploy hit warm caches"""
+	warm_caches(wait=False)
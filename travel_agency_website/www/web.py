@@ -0,0 +1,33 @@
+# Copyright (c) 2025, ERP Lagbe and contributors
+# For license information, please see license.txt
+
+import frappe
+
+from travel_agency_website.assets import get_preload_images, get_shell_assets
+from travel_agency_website.cms import get_bootstrap_json
+from travel_agency_website.prerender import get_prerendered_html
+from travel_agency_website.seo import render_head_tags
+
+# Cached per route by page_cache.ShellPageRenderer, not by the website cache
+no_cache = 1
+
+
+def get_context(context):
+	route = "/" + frappe.request.path.strip("/")
+	context.assets = get_shell_assets()
+	context.preload_images = get_preload_images(route)
+	context.bootstrap_json = get_bootstrap_json()
+
+	try:
+		context.head_tags = render_head_tags(frappe.request.path)
+	except Exception:
+		# Fall back to the default tags rather than failing the page
+		frappe.log_error(f"Error rendering SEO tags for {frappe.request.path}")
+		context.head_tags = None
+
+	try:
+		# Replaced by the app once the bundle mounts
+		context.prerender_html = get_prerendered_html(frappe.request.path)
+	except Exception:
+		frappe.log_error(f"Error prerendering {frappe.request.path}")
+		context.prerender_html = None
@@ -1,11 +1,13 @@
 import { useFrappeGetDocList, useFrappeGetCall } from 'frappe-react-sdk'
+import { getBootstrapData } from '../utils/bootstrap'
 
 // Simple hook to get Website CMS data (Single DocType)
 export const useWebsiteCMS = () => {
   const { data, error, isValidating } = useFrappeGetCall('travel_agency_website.api.get_website_cms')
   
   // Extract the actual document from the docs array (data is wrapped in message property)
-  const cmsData = data?.message?.docs?.[0] || null
+  // Until it loads, fall back to the above-the-fold sections inlined in the page
+  const cmsData = data?.message?.docs?.[0] || getBootstrapData()
   
   return {
     data: cmsData,
@@ -14,15 +16,27 @@ export const useWebsiteCMS = () => {
   }
 }
 
+// Fetch one Website CMS section (see CMS_SECTIONS in cms.py) instead of the whole document;
+// hooks asking for the same section share one request
+const useWebsiteCMSSection = (section: string) => {
+  const { data, error, isValidating } = useFrappeGetCall(
+    'travel_agency_website.api.get_website_cms_sections',
+    { sections: section }
+  )
+
+  return {
+    data: data?.message?.data?.[section] || null,
+    error,
+    isValidating
+  }
+}
+
 // Simple hook to get testimonials from parent Website CMS
 export const useTestimonials = () => {
-  const { data, error, isValidating } = useFrappeGetCall('travel_agency_website.api.get_website_cms')
-  
-  // Extract the actual document from the docs array (data is wrapped in message property)
-  const cmsData = data?.message?.docs?.[0] || null
+  const { data, error, isValidating } = useWebsiteCMSSection('testimonials')
   
   return {
-    data: cmsData?.testimonials || [],
+    data: data?.testimonials || [],
     error,
     isValidating
   }
@@ -30,13 +44,10 @@ export const useTestimonials = () => {
 
 // Simple hook to get featured packages from parent Website CMS
 export const useFeaturedPackages = () => {
-  const { data, error, isValidating } = useFrappeGetCall('travel_agency_website.api.get_website_cms')
-  
-  // Extract the actual document from the docs array (data is wrapped in message property)
-  const cmsData = data?.message?.docs?.[0] || null
+  const { data, error, isValidating } = useWebsiteCMSSection('featured_packages')
   
   return {
-    data: cmsData?.featured_packages || [],
+    data: data?.featured_packages || [],
     error,
     isValidating
   }
@@ -44,13 +55,10 @@ export const useFeaturedPackages = () => {
 
 // Simple hook to get Hajj packages from parent Website CMS
 export const useHajjPackages = () => {
-  const { data, error, isValidating } = useFrappeGetCall('travel_agency_website.api.get_website_cms')
-  
-  // Extract the actual document from the docs array (data is wrapped in message property)
-  const cmsData = data?.message?.docs?.[0] || null
+  const { data, error, isValidating } = useWebsiteCMSSection('hajj_packages')
   
   return {
-    data: cmsData?.hajj_packages || [],
+    data: data?.hajj_packages || [],
     error,
     isValidating
   }
@@ -58,13 +66,10 @@ export const useHajjPackages = () => {
 
 // Simple hook to get FAQ items from parent Website CMS
 export const useFAQItems = () => {
-  const { data, error, isValidating } = useFrappeGetCall('travel_agency_website.api.get_website_cms')
-  
-  // Extract the actual document from the docs array (data is wrapped in message property)
-  const cmsData = data?.message?.docs?.[0] || null
+  const { data, error, isValidating } = useWebsiteCMSSection('faq')
   
   return {
-    data: cmsData?.faq_items || [],
+    data: data?.faq_items || [],
     error,
     isValidating
   }
@@ -72,10 +77,9 @@ export const useFAQItems = () => {
 
 // Simple hook to get footer quick links from parent Website CMS
 export const useFooterQuickLinks = () => {
-  const { data, error, isValidating } = useFrappeGetCall('travel_agency_website.api.get_website_cms')
+  const { data, error, isValidating } = useWebsiteCMSSection('footer')
   
-  // Extract the actual document from the docs array (data is wrapped in message property)
-  const cmsData = data?.message?.docs?.[0] || null
+  const cmsData = data || getBootstrapData()
   
   return {
     data: cmsData?.footer_quick_links || [],
@@ -86,10 +90,9 @@ export const useFooterQuickLinks = () => {
 
 // Simple hook to get footer terms links from parent Website CMS
 export const useFooterTermsLinks = () => {
-  const { data, error, isValidating } = useFrappeGetCall('travel_agency_website.api.get_website_cms')
+  const { data, error, isValidating } = useWebsiteCMSSection('footer')
   
-  // Extract the actual document from the docs array (data is wrapped in message property)
-  const cmsData = data?.message?.docs?.[0] || null
+  const cmsData = data || getBootstrapData()
   
   return {
     data: cmsData?.footer_terms_links || [],
@@ -100,10 +103,9 @@ export const useFooterTermsLinks = () => {
 
 // Simple hook to get social media links from parent Website CMS
 export const useSocialMediaLinks = () => {
-  const { data, error, isValidating } = useFrappeGetCall('travel_agency_website.api.get_website_cms')
+  const { data, error, isValidating } = useWebsiteCMSSection('footer')
   
-  // Extract the actual document from the docs array (data is wrapped in message property)
-  const cmsData = data?.message?.docs?.[0] || null
+  const cmsData = data || getBootstrapData()
   
   return {
     data: cmsData?.footer_social_media || [],
@@ -114,13 +116,10 @@ export const useSocialMediaLinks = () => {
 
 // Simple hook to get gallery images from parent Website CMS
 export const useGalleryImages = () => {
-  const { data, error, isValidating } = useFrappeGetCall('travel_agency_website.api.get_website_cms')
-  
-  // Extract the actual document from the docs array (data is wrapped in message property)
-  const cmsData = data?.message?.docs?.[0] || null
+  const { data, error, isValidating } = useWebsiteCMSSection('gallery')
   
   return {
-    data: cmsData?.gallery_images || [],
+    data: data?.gallery_images || [],
     error,
     isValidating
   }
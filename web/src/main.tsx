@@ -4,8 +4,31 @@ import './index.css'
 import './styles/blog.css'
 import App from './App.tsx'
 
-createRoot(document.getElementById('root')!).render(
-  <StrictMode>
-    <App />
-  </StrictMode>,
-)
+declare global {
+  interface Window {
+    csrf_token?: string
+  }
+}
+
+// The page shell is cached and shared between users, so it no longer carries
+// the CSRF token. Logged-in users fetch it before the Frappe client is created.
+const loadCsrfToken = async () => {
+  const userId = document.cookie.match(/(?:^|;\s*)user_id=([^;]*)/)?.[1]
+  if (!userId || userId === 'Guest') return
+
+  try {
+    const response = await fetch('/api/method/travel_agency_website.api.get_csrf_token')
+    const { message } = await response.json()
+    if (message) window.csrf_token = message
+  } catch {
+    // Guest-level requests still work without the token
+  }
+}
+
+loadCsrfToken().then(() => {
+  createRoot(document.getElementById('root')!).render(
+    <StrictMode>
+      <App />
+    </StrictMode>,
+  )
+})
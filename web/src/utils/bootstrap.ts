@@ -0,0 +1,19 @@
+/**
+ * Website CMS sections inlined by the server into the page shell
+ * (business settings, navigation, hero and footer), so the first render
+ * does not wait for get_website_cms.
+ */
+let bootstrapData: Record<string, any> | null | undefined
+
+export const getBootstrapData = (): Record<string, any> | null => {
+  if (bootstrapData === undefined) {
+    try {
+      const element = document.getElementById('bootstrap-data')
+      bootstrapData = element?.textContent ? JSON.parse(element.textContent) : null
+    } catch {
+      // Not rendered by the server (e.g. the Vite dev server)
+      bootstrapData = null
+    }
+  }
+  return bootstrapData ?? null
+}
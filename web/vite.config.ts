@@ -25,5 +25,16 @@ export default defineConfig({
 		outDir: '../travel_agency_website/public/web',
 		emptyOutDir: true,
 		target: 'es2015',
+		// www/web.html reads the entry, its chunks and CSS from .vite/manifest.json
+		manifest: true,
+		rollupOptions: {
+			output: {
+				// Keep rarely changing libraries out of the app chunk so they stay cached across deploys
+				manualChunks: {
+					react: ['react', 'react-dom', 'react-router-dom'],
+					frappe: ['frappe-react-sdk'],
+				},
+			},
+		},
 	},
 });